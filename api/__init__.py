@@ -1,6 +1,7 @@
 import logging
 import json
 import azure.functions as func
+from payload_cache import Payload
 
 # Sample data for quick testing
 customers = [
@@ -64,6 +65,20 @@ orders = [
     }
 ]
 
+# The sample lists never change, so each is encoded once when the worker loads
+PAYLOADS = {
+    'customers': Payload(json.dumps(customers).encode()),
+    'products': Payload(json.dumps(products).encode()),
+    'orders': Payload(json.dumps(orders).encode())
+}
+
+def payload_response(req, name):
+    payload = PAYLOADS[name]
+    status, body, headers = payload.respond(
+        req.headers.get('If-None-Match'), req.headers.get('Accept-Encoding')
+    )
+    return func.HttpResponse(body, status_code=status, headers=headers, mimetype=payload.mimetype)
+
 def main(req: func.HttpRequest) -> func.HttpResponse:
     logging.info('Python HTTP trigger function processed a request.')
     
@@ -85,20 +100,11 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
             mimetype="application/json"
         )
     elif route == 'customers':
-        return func.HttpResponse(
-            json.dumps(customers),
-            mimetype="application/json"
-        )
+        return payload_response(req, 'customers')
     elif route == 'products':
-        return func.HttpResponse(
-            json.dumps(products),
-            mimetype="application/json"
-        )
+        return payload_response(req, 'products')
     elif route == 'orders':
-        return func.HttpResponse(
-            json.dumps(orders),
-            mimetype="application/json"
-        )
+        return payload_response(req, 'orders')
     else:
         response_data = {"error": "Route not found"}
         return func.HttpResponse(
@@ -2,8 +2,10 @@ import os
 import sys
 from flask import Flask, jsonify, request
 from flask_cors import CORS
+from src.utils.json_provider import FastJSONProvider
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app, origins=['*'])  # Allow all origins for testing
 
 # Debug information
@@ -12,9 +14,28 @@ print(f"Environment variables: {os.environ}")
 
 # Import enhanced sample data
 import sample_data
-customers = sample_data.customers
-products = sample_data.products
-orders = sample_data.orders
+from payload_cache import Payload
+from repository import Repository, SQLiteRepository
+
+# With several worker processes, set DEMO_STORE_PATH so that every worker
+# reads and writes one shared SQLite file instead of its own in-memory copy
+if os.environ.get('DEMO_STORE_PATH'):
+    store = SQLiteRepository(os.environ['DEMO_STORE_PATH'], sample_data.customers, sample_data.products, sample_data.orders)
+else:
+    store = Repository(sample_data.customers, sample_data.products, sample_data.orders)
+
+def payload_response(payload):
+    """Serve a pre-encoded payload, compressed and conditional on the request headers"""
+    status, body, headers = payload.respond(
+        request.headers.get('If-None-Match'), request.headers.get('Accept-Encoding')
+    )
+    return app.response_class(body, status=status, headers=headers, mimetype=payload.mimetype)
+
+def snapshot_response(collection):
+    """Serve a collection's current snapshot, encoding it once per version"""
+    return payload_response(collection.snapshot().encoded(
+        lambda records: Payload(app.json.response(list(records)).get_data())
+    ))
 
 @app.route('/')
 def index():
@@ -32,78 +53,82 @@ def health_check():
 
 @app.route('/api/customers')
 def get_customers():
-    return jsonify(customers)
+    return snapshot_response(store.customers)
 
 @app.route('/api/products')
 def get_products():
-    return jsonify(products)
+    return snapshot_response(store.products)
 
 @app.route('/api/orders')
 def get_orders():
-    return jsonify(orders)
+    # Optional ?customer_id= and ?status= filters use the order indexes
+    criteria = {}
+    if request.args.get('customer_id'):
+        criteria['customer_id'] = request.args.get('customer_id', type=int)
+    if request.args.get('status'):
+        criteria['status'] = request.args['status']
+    if not criteria:
+        return snapshot_response(store.orders)
+    return jsonify(store.orders.find(**criteria))
 
 # POST route for creating new customers
 @app.route('/api/customers', methods=['POST'])
 def create_customer():
     data = request.get_json()
-    new_id = max([c['id'] for c in customers]) + 1 if customers else 1
     customer = {
-        'id': new_id,
+        'id': store.customers.next_id(),
         'company_name': data.get('company_name', ''),
         'contact_person': data.get('contact_person', ''),
         'email': data.get('email', ''),
         'phone': data.get('phone', ''),
         'billing_address': data.get('billing_address', '')
     }
-    customers.append(customer)
+    store.customers.add(customer)
     return jsonify(customer), 201
 
 # PUT route for updating customers
 @app.route('/api/customers/<int:customer_id>', methods=['PUT'])
 def update_customer(customer_id):
     data = request.get_json()
-    for customer in customers:
-        if customer['id'] == customer_id:
-            customer.update(data)
-            return jsonify(customer)
-    return jsonify({'error': 'Customer not found'}), 404
+    customer = store.customers.update(customer_id, data)
+    if customer is None:
+        return jsonify({'error': 'Customer not found'}), 404
+    return jsonify(customer)
 
 # POST route for creating new products
 @app.route('/api/products', methods=['POST'])
 def create_product():
     data = request.get_json()
-    new_id = max([p['id'] for p in products]) + 1 if products else 1
     product = {
-        'id': new_id,
+        'id': store.products.next_id(),
         'sku': data.get('sku', ''),
         'product_name': data.get('product_name', ''),
         'description': data.get('description', ''),
         'unit_price': float(data.get('unit_price', 0)),
         'inventory_quantity': int(data.get('inventory_quantity', 0))
     }
-    products.append(product)
+    store.products.add(product)
     return jsonify(product), 201
 
 # PUT route for updating products
 @app.route('/api/products/<int:product_id>', methods=['PUT'])
 def update_product(product_id):
     data = request.get_json()
-    for product in products:
-        if product['id'] == product_id:
-            product.update(data)
-            return jsonify(product)
-    return jsonify({'error': 'Product not found'}), 404
+    product = store.products.update(product_id, data)
+    if product is None:
+        return jsonify({'error': 'Product not found'}), 404
+    return jsonify(product)
 
 # POST route for creating new orders
 @app.route('/api/orders', methods=['POST'])
 def create_order():
     data = request.get_json()
-    new_id = max([o['id'] for o in orders]) + 1 if orders else 1
     
     # Find customer
-    customer = next((c for c in customers if c['id'] == int(data.get('customer_id'))), None)
+    customer = store.customers.get(int(data.get('customer_id')))
     if not customer:
         return jsonify({'error': 'Customer not found'}), 400
+    new_id = store.orders.next_id()
     
     # Generate order number
     from datetime import datetime
@@ -125,41 +150,38 @@ def create_order():
         'customer': customer,
         'line_items': line_items
     }
-    orders.append(order)
+    store.orders.add(order)
     return jsonify(order), 201
 
 # Order action routes
 @app.route('/api/orders/<int:order_id>/issue', methods=['POST'])
 def issue_order(order_id):
-    for order in orders:
-        if order['id'] == order_id:
-            order['status'] = 'issued'
-            return jsonify(order)
-    return jsonify({'error': 'Order not found'}), 404
+    order = store.orders.update(order_id, {'status': 'issued'})
+    if order is None:
+        return jsonify({'error': 'Order not found'}), 404
+    return jsonify(order)
 
 @app.route('/api/orders/<int:order_id>/complete', methods=['POST'])
 def complete_order(order_id):
-    for order in orders:
-        if order['id'] == order_id:
-            order['status'] = 'complete'
-            return jsonify(order)
-    return jsonify({'error': 'Order not found'}), 404
+    order = store.orders.update(order_id, {'status': 'complete'})
+    if order is None:
+        return jsonify({'error': 'Order not found'}), 404
+    return jsonify(order)
 
 @app.route('/api/orders/<int:order_id>/void', methods=['POST'])
 def void_order(order_id):
-    for order in orders:
-        if order['id'] == order_id:
-            order['status'] = 'voided'
-            return jsonify(order)
-    return jsonify({'error': 'Order not found'}), 404
+    order = store.orders.update(order_id, {'status': 'voided'})
+    if order is None:
+        return jsonify({'error': 'Order not found'}), 404
+    return jsonify(order)
 
 # Get single order
 @app.route('/api/orders/<int:order_id>', methods=['GET'])
 def get_order(order_id):
-    for order in orders:
-        if order['id'] == order_id:
-            return jsonify(order)
-    return jsonify({'error': 'Order not found'}), 404
+    order = store.orders.get(order_id)
+    if order is None:
+        return jsonify({'error': 'Order not found'}), 404
+    return jsonify(order)
 
 # Payment routes
 @app.route('/api/orders/<int:order_id>/payments', methods=['GET'])
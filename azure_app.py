@@ -2,6 +2,7 @@ import os
 import sys
 from flask import Flask, jsonify, request
 from flask_cors import CORS
+from payload_cache import Payload
 
 app = Flask(__name__)
 CORS(app, origins=['https://brave-coast-082fed100.2.azurestaticapps.net', 'http://localhost:5173'])
@@ -74,6 +75,20 @@ orders = [
     }
 ]
 
+# The sample lists never change, so each is encoded once at startup
+PAYLOADS = {
+    name: Payload(app.json.response(data).get_data())
+    for name, data in (('customers', customers), ('products', products), ('orders', orders))
+}
+
+def payload_response(name):
+    """Serve a pre-encoded list, compressed and conditional on the request headers"""
+    payload = PAYLOADS[name]
+    status, body, headers = payload.respond(
+        request.headers.get('If-None-Match'), request.headers.get('Accept-Encoding')
+    )
+    return app.response_class(body, status=status, headers=headers, mimetype=payload.mimetype)
+
 @app.route('/')
 def index():
     return jsonify({"message": "Sales Order API is running on Azure"})
@@ -90,15 +105,15 @@ def health_check():
 
 @app.route('/api/customers')
 def get_customers():
-    return jsonify(customers)
+    return payload_response('customers')
 
 @app.route('/api/products')
 def get_products():
-    return jsonify(products)
+    return payload_response('products')
 
 @app.route('/api/orders')
 def get_orders():
-    return jsonify(orders)
+    return payload_response('orders')
 
 if __name__ == '__main__':
     # Get port from environment variable with fallback
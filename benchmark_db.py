@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Concurrent read/write load test for the database engine configuration.
+
+Starts several worker processes, like gunicorn workers, each running
+threads that call the API against one shared SQLite file through the Flask
+test client. Most requests list orders and products; the rest create
+orders. Prints throughput, p99 latency and failed requests (typically
+"database is locked").
+
+    python benchmark_db.py --workers 4 --threads 4 --seconds 10
+    python benchmark_db.py --baseline   # rollback journal, synchronous=FULL, no mmap
+
+Engine and PRAGMA settings come from the same environment variables as
+the app (see src/models/engine.py).
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# Settings SQLite and pysqlite use when nothing is configured
+BASELINE_PRAGMAS = {
+    'SQLITE_JOURNAL_MODE': 'DELETE',
+    'SQLITE_SYNCHRONOUS': 'FULL',
+    'SQLITE_BUSY_TIMEOUT': '5000',
+    'SQLITE_MMAP_SIZE': '0'
+}
+
+def load_app():
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from src.main import app
+    return app
+
+def seed(customers=20, products=50):
+    app = load_app()
+    client = app.test_client()
+    for i in range(customers):
+        client.post('/api/customers', json={'company_name': f'Load Test {i}', 'email': f'load{i}@example.com'})
+    for i in range(products):
+        client.post('/api/products', json={
+            'sku': f'LOAD-{i:04d}', 'product_name': f'Load Product {i}',
+            'unit_price': 10 + i, 'inventory_quantity': 1000000
+        })
+    for i in range(200):
+        client.post('/api/orders', json={
+            'customer_id': 1 + i % customers,
+            'line_items': [{'product_id': 1 + i % products, 'quantity': 1}]
+        })
+
+def run_worker(args, seconds, results):
+    app = load_app()
+    deadline = time.monotonic() + seconds
+    samples = []
+
+    def loop(rng):
+        client = app.test_client()
+        while time.monotonic() < deadline:
+            write = rng.random() < args.write_ratio
+            start = time.perf_counter()
+            if write:
+                response = client.post('/api/orders', json={
+                    'customer_id': rng.randint(1, 20),
+                    'line_items': [
+                        {'product_id': rng.randint(1, 50), 'quantity': rng.randint(1, 5)}
+                        for _ in range(rng.randint(1, 4))
+                    ]
+                })
+            elif rng.random() < 0.5:
+                response = client.get('/api/orders?limit=50')
+            else:
+                response = client.get(f'/api/products/{rng.randint(1, 50)}')
+            samples.append((write, time.perf_counter() - start, response.status_code < 400))
+
+    threads = [threading.Thread(target=loop, args=(random.Random(i),)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent read/write load test')
+    parser.add_argument('--workers', type=int, default=4, help='worker processes')
+    parser.add_argument('--threads', type=int, default=4, help='threads per worker')
+    parser.add_argument('--seconds', type=float, default=10, help='test duration')
+    parser.add_argument('--write-ratio', type=float, default=0.2, help='share of requests that create orders')
+    parser.add_argument('--baseline', action='store_true', help='use SQLite default PRAGMAs')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='benchmark-db-')
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(directory, 'load.db')}")
+    if args.baseline:
+        os.environ.update(BASELINE_PRAGMAS)
+
+    # Create the schema and seed data once, before the workers start
+    context = multiprocessing.get_context('spawn')
+    process = context.Process(target=seed)
+    process.start()
+    process.join()
+
+    results = context.Queue()
+    workers = [
+        context.Process(target=run_worker, args=(args, args.seconds, results))
+        for _ in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    samples = [sample for _ in workers for sample in results.get()]
+    for worker in workers:
+        worker.join()
+
+    print(f"{'baseline' if args.baseline else 'configured'} PRAGMAs, "
+          f'{args.workers} workers x {args.threads} threads, {args.seconds:g}s, {args.write_ratio:.0%} writes')
+    for label, wanted in (('reads', False), ('writes', True)):
+        group = [s for s in samples if s[0] == wanted]
+        latencies = sorted(s[1] for s in group)
+        if not latencies:
+            continue
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        failed = sum(1 for s in group if not s[2])
+        print(f'{label:<7} {len(group) / args.seconds:>8.1f} req/s   '
+              f'median {statistics.median(latencies) * 1000:>7.1f} ms   '
+              f'p99 {p99 * 1000:>7.1f} ms   failed {failed}')
+
+if __name__ == '__main__':
+    main()
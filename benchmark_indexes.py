@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Show query plans and timings of the order, payment and customer lookups
+with and without the indexes added by the schema migrations.
+
+Builds a synthetic SQLite database (orders with line items and payments),
+drops every index the migrations create, and runs EXPLAIN QUERY PLAN and
+a timed run of each query. It then recreates the indexes with the
+migration statements and repeats. The queries are compiled from the same
+SQLAlchemy expressions the endpoints use.
+
+    python benchmark_indexes.py --orders 200000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATUSES = ('unissued', 'issued', 'complete', 'voided')
+
+def migration_indexes():
+    """(name, CREATE INDEX statement) for every index the migrations create"""
+    from src.models.migrations import MIGRATIONS
+    indexes = []
+    for _, _, statements in MIGRATIONS:
+        for statement in statements:
+            match = isinstance(statement, str) and re.match(r'CREATE INDEX IF NOT EXISTS (\w+)', statement)
+            if match:
+                indexes.append((match.group(1), statement))
+    return indexes
+
+def populate(path, orders, customers, products):
+    rng = random.Random(42)
+    start = datetime(2023, 1, 1)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        'INSERT INTO customers (id, company_name, email, created_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+        [(i, f'Customer {i}', f'customer{i}@example.com', start, start) for i in range(1, customers + 1)]
+    )
+    conn.executemany(
+        'INSERT INTO products (id, sku, product_name, unit_price, inventory_quantity, created_at, updated_at) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+        [(i, f'SKU-{i:05d}', f'Product {i}', 10 + i % 90, 1000, start, start) for i in range(1, products + 1)]
+    )
+    order_rows, item_rows, payment_rows = [], [], []
+    for i in range(1, orders + 1):
+        created = start + timedelta(minutes=i * 5, seconds=rng.randint(0, 59))
+        order_rows.append((
+            i, f'SO-{i:08d}', rng.randint(1, customers), created, rng.choice(STATUSES),
+            90, 'unpaid', 0, created, created
+        ))
+        for j in range(3):
+            item_rows.append((i * 3 + j, i, rng.randint(1, products), 1, 30, 30, 'unfulfilled', 0))
+        if i % 3 == 0:
+            payment_rows.append((i, i, 30, created, 'card', created))
+    conn.executemany(
+        'INSERT INTO sales_orders (id, order_number, customer_id, order_date, status, total_amount, '
+        'payment_status, paid_amount, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        order_rows
+    )
+    conn.executemany(
+        'INSERT INTO order_line_items (id, order_id, product_id, quantity, unit_price, line_total, '
+        'fulfillment_status, fulfilled_quantity) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        item_rows
+    )
+    conn.executemany(
+        'INSERT INTO payments (id, order_id, payment_amount, payment_date, payment_method, created_at) '
+        'VALUES (?, ?, ?, ?, ?, ?)',
+        payment_rows
+    )
+    conn.commit()
+    return conn
+
+def endpoint_queries(orders, customers):
+    """(label, SQL) for the lookups the indexes are meant to serve"""
+    from sqlalchemy import func
+    from sqlalchemy.dialects import sqlite
+    from src.models.database import db, Customer, OrderLineItem, Payment, SalesOrder
+    from src.models.serializers import LINE_ITEM, order_columns
+    from src.routes.orders import filtered_orders_query
+
+    def page(args):
+        return (
+            filtered_orders_query(args).with_entities(*order_columns())
+            .order_by(SalesOrder.created_at.desc(), SalesOrder.id.desc())
+            .limit(51)
+        )
+
+    middle = orders // 2
+    day = datetime(2023, 1, 1) + timedelta(minutes=middle * 5)
+    queries = [
+        ('GET /orders?limit=50', page({})),
+        ('GET /orders?status=voided&limit=50', page({'status': 'voided'})),
+        ('GET /orders?customer_id=7&limit=50', page({'customer_id': 7})),
+        ('line items of a 50-order page', (
+            db.session.query(*LINE_ITEM.columns())
+            .filter(OrderLineItem.order_id.in_(range(middle, middle + 50)))
+            .order_by(OrderLineItem.order_id, OrderLineItem.id)
+        )),
+        ('GET /orders/<id>/payments', Payment.query.filter_by(order_id=middle)),
+        ('customer by email', Customer.query.filter_by(email=f'customer{customers // 2}@example.com')),
+        ('orders in a 7-day order_date range', (
+            db.session.query(func.count(SalesOrder.id), func.sum(SalesOrder.total_amount))
+            .filter(SalesOrder.order_date >= day, SalesOrder.order_date < day + timedelta(days=7))
+        )),
+    ]
+    return [
+        (label, str(query.statement.compile(dialect=sqlite.dialect(), compile_kwargs={'literal_binds': True})))
+        for label, query in queries
+    ]
+
+def measure(conn, queries, repeat):
+    results = {}
+    for label, sql in queries:
+        plan = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}')]
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(sql).fetchall()
+            timings.append(time.perf_counter() - start)
+        results[label] = (plan, statistics.median(timings))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Query plans and timings with and without the migration indexes')
+    parser.add_argument('--orders', type=int, default=200000, help='synthetic orders (three line items each)')
+    parser.add_argument('--customers', type=int, default=2000)
+    parser.add_argument('--products', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per query')
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix='benchmark-indexes-'), 'bench.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    sys.path.insert(0, ROOT)
+    from src.main import app
+
+    with app.app_context():
+        queries = endpoint_queries(args.orders, args.customers)
+    conn = populate(path, args.orders, args.customers, args.products)
+    indexes = migration_indexes()
+
+    for name, _ in indexes:
+        conn.execute(f'DROP INDEX IF EXISTS {name}')
+    conn.execute('ANALYZE')
+    before = measure(conn, queries, args.repeat)
+    for _, statement in indexes:
+        conn.execute(statement)
+    conn.execute('ANALYZE')
+    after = measure(conn, queries, args.repeat)
+
+    print(f'{args.orders} orders, {args.orders * 3} line items, {args.orders // 3} payments; '
+          f'median of {args.repeat} runs; {len(indexes)} migration indexes')
+    for label, _ in queries:
+        plan_before, seconds_before = before[label]
+        plan_after, seconds_after = after[label]
+        print(f'\n{label}: {seconds_before * 1000:.2f} ms -> {seconds_after * 1000:.2f} ms '
+              f'({seconds_before / max(seconds_after, 1e-9):.0f}x)')
+        print(f"  before: {' | '.join(plan_before)}")
+        print(f"  after:  {' | '.join(plan_after)}")
+
+if __name__ == '__main__':
+    main()
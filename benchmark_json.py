@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark the JSON encoders behind the API on realistic order list payloads.
+
+Compares Flask's default provider encoding pre-formatted order dicts (floats
+and ISO strings, as to_dict used to build them) with FastJSONProvider
+encoding raw Decimal/datetime values through the standard library encoder
+and, when it is installed, through orjson.
+
+    python benchmark_json.py --orders 2000 --repeat 20
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from src.utils import json_provider
+from src.utils.json_provider import FastJSONProvider
+
+def money(value):
+    return Decimal(value).quantize(Decimal('0.01'))
+
+def make_orders(count, seed=42):
+    """Order dicts shaped like SalesOrder.to_dict(), with raw column values"""
+    rng = random.Random(seed)
+    now = datetime(2025, 6, 26, 12, 0, 0)
+    customers = [
+        {
+            'id': i,
+            'company_name': f'Customer {i} Ltd',
+            'contact_person': f'Contact {i}',
+            'email': f'contact{i}@example.com',
+            'phone': f'555-{i:04d}',
+            'billing_address': f'{i} Main St, Anytown',
+            'created_at': now - timedelta(days=400, seconds=i),
+            'updated_at': now - timedelta(days=10, seconds=i)
+        }
+        for i in range(1, 101)
+    ]
+    products = [
+        {
+            'id': i,
+            'sku': f'SKU-{i:05d}',
+            'product_name': f'Product {i}',
+            'description': 'A product used for benchmarking the order list encoder',
+            'unit_price': money(rng.uniform(1, 500)),
+            'inventory_quantity': rng.randint(0, 1000),
+            'created_at': now - timedelta(days=300, seconds=i),
+            'updated_at': now - timedelta(days=5, seconds=i)
+        }
+        for i in range(1, 201)
+    ]
+    orders = []
+    for i in range(1, count + 1):
+        created = now - timedelta(minutes=i, microseconds=rng.randint(0, 999999))
+        line_items = []
+        for j in range(rng.randint(1, 5)):
+            product = rng.choice(products)
+            quantity = rng.randint(1, 10)
+            line_items.append({
+                'id': i * 10 + j,
+                'order_id': i,
+                'product_id': product['id'],
+                'product': product,
+                'quantity': quantity,
+                'unit_price': product['unit_price'],
+                'line_total': product['unit_price'] * quantity,
+                'fulfillment_status': 'unfulfilled',
+                'fulfilled_quantity': 0
+            })
+        total = sum(item['line_total'] for item in line_items)
+        payments = [
+            {
+                'id': i,
+                'order_id': i,
+                'payment_amount': total,
+                'payment_date': created + timedelta(days=3),
+                'payment_method': 'card',
+                'reference_number': f'REF-{i}',
+                'created_at': created + timedelta(days=3)
+            }
+        ] if i % 3 == 0 else []
+        customer = rng.choice(customers)
+        orders.append({
+            'id': i,
+            'order_number': f'ORD-{created:%Y%m%d}-{i:06d}',
+            'customer_id': customer['id'],
+            'customer': customer,
+            'order_date': created,
+            'status': rng.choice(['unissued', 'issued', 'complete', 'voided']),
+            'total_amount': total,
+            'payment_status': 'paid' if payments else 'unpaid',
+            'paid_amount': total if payments else Decimal('0.00'),
+            'delivery_address': f"{customer['billing_address']} (Delivery)",
+            'line_items': line_items,
+            'payments': payments,
+            'created_at': created,
+            'updated_at': created
+        })
+    return orders
+
+def preformat(value):
+    """Convert raw values the way to_dict() used to, with float() and isoformat()"""
+    if isinstance(value, dict):
+        return {key: preformat(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [preformat(item) for item in value]
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+@contextmanager
+def stdlib_only():
+    """Make FastJSONProvider fall back to the standard library encoder"""
+    orjson = json_provider.orjson
+    json_provider.orjson = None
+    try:
+        yield
+    finally:
+        json_provider.orjson = orjson
+
+def measure(encode, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = encode()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), body
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON encoders on order list payloads')
+    parser.add_argument('--orders', type=int, default=2000, help='orders per payload')
+    parser.add_argument('--repeat', type=int, default=20, help='encodings per encoder')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+    raw = make_orders(args.orders)
+    formatted = preformat(raw)
+
+    print(f'{args.orders} orders, median of {args.repeat} runs, Python {sys.version.split()[0]}')
+    print(f"{'encoder':<46} {'ms':>9} {'MB/s':>9} {'bytes':>10}")
+
+    def report(name, encode):
+        seconds, body = measure(encode, args.repeat)
+        print(f'{name:<46} {seconds * 1000:>9.2f} {len(body) / seconds / 1e6:>9.1f} {len(body):>10}')
+        return body
+
+    report('default provider, to_dict floats/ISO strings', lambda: default_provider.response(preformat(raw)).get_data())
+    baseline = report('default provider, encoding only', lambda: default_provider.response(formatted).get_data())
+    with stdlib_only():
+        stdlib = report('FastJSONProvider, raw values, stdlib', lambda: fast_provider.response(raw).get_data())
+    print(f'stdlib output identical to the default provider: {stdlib == baseline}')
+
+    if json_provider.orjson is None:
+        print('orjson is not installed; pip install orjson to benchmark it')
+        return
+    fast = report('FastJSONProvider, raw values, orjson', lambda: fast_provider.response(raw).get_data())
+    print(f'orjson output decodes to the same values: {fast_provider.loads(fast) == fast_provider.loads(baseline)}')
+
+if __name__ == '__main__':
+    main()
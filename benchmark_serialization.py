@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark the order list serializer against per-order to_dict() calls.
+
+Seeds a temporary SQLite database with orders of three line items each
+(every third order paid), then times building and encoding the order list
+response:
+
+- to_dict: eager-loaded ORM instances and SalesOrder.to_dict(), as the list
+  endpoint used to do
+- schema: column tuples through serialize_orders(), in the default shape
+  and with field selection and embed=0
+
+Prints the median time and payload size of each variant, and how many
+times smaller and faster each one is than to_dict. The goal is at least 3x.
+
+    python benchmark_serialization.py --orders 3000 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TARGET = 3.0
+# Cent prices whose sums are inexact as floats (2 x 10.10 + 3 x 3.3, 3 x 0.1)
+PRICES = (10.10, 3.3, 0.1, 5)
+
+def load_app():
+    sys.path.insert(0, ROOT)
+    from src.main import app
+    return app
+
+def seed(app, orders, customers=50, products=100):
+    client = app.test_client()
+    for i in range(customers):
+        client.post('/api/customers', json={
+            'company_name': f'Serializer {i} Ltd', 'contact_person': f'Contact {i}',
+            'email': f'serializer{i}@example.com', 'billing_address': f'{i} Main St'
+        })
+    for i in range(products):
+        client.post('/api/products', json={
+            'sku': f'SER-{i:04d}', 'product_name': f'Serializer Product {i}',
+            'description': 'A product used to benchmark the order serializer',
+            'unit_price': PRICES[i % len(PRICES)] + i // len(PRICES), 'inventory_quantity': 1000
+        })
+    for start in range(0, orders, 500):
+        client.post('/api/orders/bulk', json=[
+            {
+                'customer_id': 1 + i % customers,
+                'delivery_address': f'{i} Delivery Rd',
+                'line_items': [{'product_id': 1 + (i + j) % products, 'quantity': 1 + j} for j in range(3)]
+            }
+            for i in range(start, min(start + 500, orders))
+        ])
+    for order_id in range(3, orders + 1, 3):
+        client.post(f'/api/orders/{order_id}/payments', json={'payment_amount': 1, 'payment_method': 'card'})
+
+def measure(build, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = build()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), body
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the order list serializer')
+    parser.add_argument('--orders', type=int, default=3000, help='orders in the list')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per variant')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='benchmark-serialization-'), 'bench.db')}")
+    app = load_app()
+    seed(app, args.orders)
+
+    from src.models.database import SalesOrder
+    from src.models.serializers import ORDER_FIELDS, order_columns, parse_fields, serialize_orders
+    from src.routes.orders import order_graph_options
+
+    def to_dict_body():
+        orders = SalesOrder.query.options(*order_graph_options()).order_by(SalesOrder.created_at.desc()).all()
+        return app.json.response([order.to_dict() for order in orders]).get_data()
+
+    def schema_body(raw_fields=None, embed=True):
+        def build():
+            fields = parse_fields(raw_fields, ORDER_FIELDS)
+            rows = SalesOrder.query.with_entities(*order_columns(fields)).order_by(SalesOrder.created_at.desc()).all()
+            return app.json.response(serialize_orders(rows, fields, embed)).get_data()
+        return build
+
+    variants = [
+        ('schema, default shape', schema_body()),
+        ('schema, embed=0', schema_body(embed=False)),
+        ('schema, fields=id,status,total_amount', schema_body('id,status,total_amount')),
+        ('schema, fields=...,customer&embed=0', schema_body('id,status,total_amount,customer', embed=False)),
+    ]
+
+    with app.test_request_context():
+        baseline_seconds, baseline = measure(to_dict_body, args.repeat)
+        print(f'{args.orders} orders, median of {args.repeat} runs')
+        print(f"{'variant':<40} {'ms':>9} {'bytes':>10} {'faster':>7} {'smaller':>8}")
+        print(f"{'to_dict, eager-loaded':<40} {baseline_seconds * 1000:>9.1f} {len(baseline):>10} {'1.0x':>7} {'1.0x':>8}")
+        for name, build in variants:
+            seconds, body = measure(build, args.repeat)
+            faster = baseline_seconds / seconds
+            smaller = len(baseline) / len(body)
+            mark = '' if faster >= TARGET and smaller >= TARGET else '  (below 3x)'
+            print(f'{name:<40} {seconds * 1000:>9.1f} {len(body):>10} {faster:>6.1f}x {smaller:>7.1f}x{mark}')
+            if name == 'schema, default shape':
+                print(f'{"":<40} default shape identical to to_dict: {body == baseline}')
+
+if __name__ == '__main__':
+    main()
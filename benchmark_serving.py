@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Compare sync and threaded (gthread) gunicorn workers.
+
+Starts the API under each worker class with the same number of worker
+processes (or --sync-workers for the sync workers, to compare at equal
+memory):
+
+- sync: gunicorn's default workers, one request at a time per process
+- gthread: gunicorn threaded workers, as deployed by Procfile and
+  startup.txt, with GUNICORN_THREADS threads per process (default
+  DB_POOL_SIZE + DB_MAX_OVERFLOW, so every thread can get a connection)
+
+Concurrent clients then request order and customer pages for a fixed time.
+Prints requests per second, median and p99 latency, and the resident
+memory of the server processes.
+
+Database round trips are near-instant with a local SQLite file, so
+--db-latency adds a sleep before every statement to stand in for a network
+database. That is the I/O wait that gthread workers overlap.
+
+    python benchmark_serving.py --workers 2 --clients 32 --db-latency 5
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PATHS = ('/api/orders?limit=20', '/api/customers?limit=20', '/api/orders/1')
+
+def _add_latency(app):
+    latency = float(os.environ.get('BENCH_DB_LATENCY_MS', 0)) / 1000
+    if latency:
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        @event.listens_for(Engine, 'before_cursor_execute')
+        def wait(*args):
+            time.sleep(latency)
+    return app
+
+def wsgi_app():
+    """Factory for gunicorn: the Flask app with the simulated database latency"""
+    sys.path.insert(0, ROOT)
+    from src.main import app
+    return _add_latency(app)
+
+def gthread_threads():
+    """Threads per gthread worker: GUNICORN_THREADS, or the database pool size"""
+    sys.path.insert(0, ROOT)
+    from src.models.engine import pool_capacity
+    return int(os.environ.get('GUNICORN_THREADS') or pool_capacity())
+
+def seed():
+    sys.path.insert(0, ROOT)
+    from src.main import app
+    client = app.test_client()
+    for i in range(10):
+        client.post('/api/customers', json={'company_name': f'Bench {i}', 'email': f'bench{i}@example.com'})
+    client.post('/api/products', json={'sku': 'BENCH-1', 'product_name': 'Bench', 'unit_price': 5, 'inventory_quantity': 10 ** 6})
+    for i in range(100):
+        client.post('/api/orders', json={'customer_id': 1 + i % 10, 'line_items': [{'product_id': 1, 'quantity': 1}]})
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def rss_kb(pid):
+    """Resident memory of a process and its children"""
+    total = 0
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            total += next(int(line.split()[1]) for line in status if line.startswith('VmRSS'))
+        with open(f'/proc/{pid}/task/{pid}/children') as children:
+            total += sum(rss_kb(int(child)) for child in children.read().split())
+    except (OSError, StopIteration):
+        pass
+    return total
+
+def server_command(mode, port, workers):
+    threaded = ['--worker-class', 'gthread', '--threads', str(gthread_threads())] if mode == 'gthread' else []
+    return [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+            *threaded, '--log-level', 'warning', 'benchmark_serving:wsgi_app()']
+
+def wait_for(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', PATHS[0])
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server on port {port} did not start')
+
+def load(port, clients, seconds):
+    latencies = []
+    errors = [0]
+    deadline = time.monotonic() + seconds
+
+    def client(index):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        count = index
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                connection.request('GET', PATHS[count % len(PATHS)])
+                response = connection.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors[0] += 1
+            count += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), errors[0]
+
+def run(mode, args, env):
+    port = free_port()
+    workers = args.sync_workers if mode == 'sync' and args.sync_workers else args.workers
+    server = subprocess.Popen(server_command(mode, port, workers), cwd=ROOT, env=env)
+    try:
+        wait_for(port)
+        load(port, args.clients, 2)  # warm up every worker
+        latencies, errors = load(port, args.clients, args.seconds)
+        memory = rss_kb(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0
+    print(f'{mode:<7} {workers:>7} {len(latencies) / args.seconds:>8.1f} {statistics.median(latencies) * 1000 if latencies else 0:>10.1f} '
+          f'{p99 * 1000:>9.1f} {errors:>7} {memory / 1024:>9.1f}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare sync and gthread gunicorn workers')
+    parser.add_argument('--workers', type=int, default=2, help='worker processes for both worker classes')
+    parser.add_argument('--sync-workers', type=int, help='override --workers for sync gunicorn, e.g. to match gthread memory use')
+    parser.add_argument('--clients', type=int, default=32, help='concurrent client connections')
+    parser.add_argument('--seconds', type=float, default=10, help='measured duration per server')
+    parser.add_argument('--db-latency', type=float, default=5, help='milliseconds added to each statement')
+    parser.add_argument('--modes', default='sync,gthread', help='worker classes to run, comma-separated')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='benchmark-serving-'), 'bench.db')}")
+    env['BENCH_DB_LATENCY_MS'] = str(args.db_latency)
+    subprocess.run([sys.executable, '-c', 'import benchmark_serving; benchmark_serving.seed()'],
+                   cwd=ROOT, env=dict(env, BENCH_DB_LATENCY_MS='0'), check=True, stdout=subprocess.DEVNULL)
+
+    print(f'{args.clients} clients, {args.seconds:g}s, {args.db_latency:g} ms per statement')
+    print(f"{'mode':<7} {'workers':>7} {'req/s':>8} {'median ms':>10} {'p99 ms':>9} {'errors':>7} {'RSS MB':>9}")
+    for mode in args.modes.split(','):
+        run(mode.strip(), args, env)
+
+if __name__ == '__main__':
+    main()
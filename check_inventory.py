@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Stress inventory reservation against hot SKUs.
+
+Creates more unissued orders than the stock of two hot products can
+cover, each order needing one of each. Worker processes then run threads
+that issue the orders concurrently through the API. Every order is
+issued twice to also race duplicate issue calls. Checks that:
+
+- inventory_quantity never goes below zero
+- exactly as many orders are issued as the stock permits
+- every other issue call is refused with 400 (shortfall or already issued)
+- stock taken matches the issued orders
+
+    python check_inventory.py --workers 4 --threads 8 --orders 120 --stock 40
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def load_app():
+    sys.path.insert(0, ROOT)
+    from src.main import app
+    return app
+
+def seed(orders, stock):
+    app = load_app()
+    client = app.test_client()
+    client.post('/api/customers', json={'company_name': 'Hot SKU Ltd', 'email': 'hot@example.com'})
+    client.post('/api/products', json={'sku': 'HOT-1', 'product_name': 'Hot Widget', 'unit_price': 5, 'inventory_quantity': stock})
+    client.post('/api/products', json={'sku': 'HOT-2', 'product_name': 'Hot Gadget', 'unit_price': 7, 'inventory_quantity': stock * 2})
+    client.post('/api/orders/bulk', json=[
+        {'customer_id': 1, 'line_items': [{'product_id': 1, 'quantity': 1}, {'product_id': 2, 'quantity': 1}]}
+        for _ in range(orders)
+    ])
+
+def run_worker(order_ids, threads, results):
+    app = load_app()
+    statuses = Counter()
+    lock = threading.Lock()
+    queue = list(order_ids)
+
+    def loop():
+        client = app.test_client()
+        while True:
+            with lock:
+                if not queue:
+                    return
+                order_id = queue.pop()
+            response = client.post(f'/api/orders/{order_id}/issue')
+            body = response.get_json() or {}
+            if response.status_code == 200:
+                outcome = 'issued'
+            elif response.status_code == 400 and 'shortfalls' in body:
+                outcome = 'shortfall'
+            elif response.status_code == 400:
+                outcome = 'already issued'
+            else:
+                outcome = f'{response.status_code}: {body.get("error")}'
+            with lock:
+                statuses[(order_id, outcome)] += 1
+
+    workers = [threading.Thread(target=loop) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put(statuses)
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress inventory reservation against hot SKUs')
+    parser.add_argument('--workers', type=int, default=4, help='worker processes')
+    parser.add_argument('--threads', type=int, default=8, help='threads per worker')
+    parser.add_argument('--orders', type=int, default=120, help='orders competing for the hot stock')
+    parser.add_argument('--stock', type=int, default=40, help='units of the scarcer hot product')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='check-inventory-'), 'check.db')}")
+    seed_process = multiprocessing.Process(target=seed, args=(args.orders, args.stock))
+    seed_process.start()
+    seed_process.join()
+
+    # Every order twice, spread over the workers in random order
+    calls = list(range(1, args.orders + 1)) * 2
+    random.Random(7).shuffle(calls)
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(calls[index::args.workers], args.threads, results))
+        for index in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    outcomes = Counter()
+    for _ in processes:
+        outcomes.update(results.get())
+    for process in processes:
+        process.join()
+
+    issued_orders = {order_id for (order_id, outcome) in outcomes if outcome == 'issued'}
+    by_outcome = Counter()
+    for (order_id, outcome), count in outcomes.items():
+        by_outcome[outcome] += count
+
+    app = load_app()
+    from src.models.database import Product, SalesOrder
+    with app.app_context():
+        stock = {product.sku: product.inventory_quantity for product in Product.query.all()}
+        issued_in_db = SalesOrder.query.filter_by(status='issued').count()
+
+    expected = min(args.orders, args.stock)
+    checks = [
+        ('no negative inventory', all(quantity >= 0 for quantity in stock.values())),
+        (f'{expected} orders issued', len(issued_orders) == expected == issued_in_db),
+        ('no order issued twice', by_outcome['issued'] == len(issued_orders)),
+        ('stock taken matches issued orders',
+         stock['HOT-1'] == args.stock - expected and stock['HOT-2'] == args.stock * 2 - expected),
+        ('every other call refused with 400', sum(by_outcome.values()) == by_outcome['issued'] + by_outcome['shortfall'] + by_outcome['already issued']),
+    ]
+
+    print(f'{args.workers} workers x {args.threads} threads, {args.orders} orders issued twice each, stock {args.stock}')
+    for outcome, count in sorted(by_outcome.items()):
+        print(f'  {outcome:<20} {count}')
+    print(f'  remaining stock      {stock}')
+    failures = [label for label, ok in checks if not ok]
+    for label, ok in checks:
+        print(f"{'ok  ' if ok else 'FAIL'} {label}")
+    if failures:
+        sys.exit(f'{len(failures)} check(s) failed')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Check that loading orders costs a fixed number of SQL statements.
+
+Seeds a temporary SQLite database with N orders, each with line items and
+a payment, and counts the statements the order list and order detail
+endpoints send. It then grows the data to 10N orders and checks that every
+count is unchanged, i.e. no statement is issued per order, line item,
+product or payment.
+
+    python check_query_counts.py --orders 50
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+PATHS = (
+    '/api/orders',
+    '/api/orders?limit=500',
+    '/api/orders?embed=0',
+    '/api/orders/1',
+)
+
+def main():
+    parser = argparse.ArgumentParser(description='Check statement counts of the order endpoints')
+    parser.add_argument('--orders', type=int, default=50, help='orders in the first round; the second has 10x')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='check-query-counts-'), 'check.db')}"
+    sys.path.insert(0, ROOT)
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from src.main import app
+
+    client = app.test_client()
+    client.post('/api/customers', json={'company_name': 'Count Check Ltd', 'email': 'count@example.com'})
+    client.post('/api/customers', json={'company_name': 'Count Check Two', 'email': 'count2@example.com'})
+    for i in range(3):
+        client.post('/api/products', json={
+            'sku': f'COUNT-{i}', 'product_name': f'Count Widget {i}', 'unit_price': 10 + i, 'inventory_quantity': 10 ** 6
+        })
+
+    def add_orders(count):
+        created = client.post('/api/orders/bulk', json=[
+            {
+                'customer_id': 1 + i % 2,
+                'line_items': [{'product_id': 1 + (i + j) % 3, 'quantity': 1} for j in range(3)]
+            }
+            for i in range(count)
+        ]).get_json()
+        for result in created['results']:
+            client.post(f"/api/orders/{result['id']}/payments", json={'payment_amount': 1})
+
+    statements = [0]
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def count(*args):
+        statements[0] += 1
+
+    def measure():
+        counts = {}
+        for path in PATHS:
+            statements[0] = 0
+            response = client.get(path)
+            if response.status_code != 200:
+                sys.exit(f'GET {path} returned {response.status_code}')
+            counts[path] = statements[0]
+        return counts
+
+    add_orders(args.orders)
+    small = measure()
+    add_orders(args.orders * 9)
+    large = measure()
+
+    print(f"{'endpoint':<28} {args.orders:>8} {args.orders * 10:>8}   orders")
+    failures = []
+    for path in PATHS:
+        ok = small[path] == large[path]
+        print(f"{path:<28} {small[path]:>8} {large[path]:>8}   {'ok' if ok else 'FAIL'}")
+        if not ok:
+            failures.append(path)
+    if failures:
+        sys.exit(f'Statement count grows with the number of orders for {len(failures)} endpoint(s)')
+    print('Statement counts are constant in the number of orders')
+
+if __name__ == '__main__':
+    main()
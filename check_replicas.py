@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Check read-replica routing against a local primary and replica database.
+
+Creates a primary SQLite database with some data and copies it to a second
+file that plays the read replica, then starts the app with
+DATABASE_REPLICA_URLS pointing at the copy. It counts the statements each
+database receives and checks that:
+
+- GET requests read from the replica only
+- writes go to the primary only
+- after a write, the client's reads stay on the primary (read-your-writes)
+- cached catalog responses are filled from the primary, so another client
+  sees a product change at once even though the replica lags
+
+    python check_replicas.py
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def seed_primary():
+    sys.path.insert(0, ROOT)
+    from src.main import app
+    client = app.test_client()
+    client.post('/api/customers', json={'company_name': 'Replica Check Ltd', 'email': 'replica@example.com'})
+    client.post('/api/products', json={
+        'sku': 'REPLICA-1', 'product_name': 'Replica Widget', 'unit_price': 12.5, 'inventory_quantity': 100
+    })
+    client.post('/api/orders', json={'customer_id': 1, 'line_items': [{'product_id': 1, 'quantity': 2}]})
+
+def copy_database(source, target):
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+
+def main():
+    if sys.argv[1:] == ['--seed']:
+        seed_primary()
+        return
+
+    directory = tempfile.mkdtemp(prefix='check-replicas-')
+    primary = os.path.join(directory, 'primary.db')
+    replica = os.path.join(directory, 'replica.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{primary}'
+    subprocess.run([sys.executable, __file__, '--seed'], check=True, stdout=subprocess.DEVNULL)
+    copy_database(primary, replica)
+    os.environ['DATABASE_REPLICA_URLS'] = f'sqlite:///{replica}'
+
+    sys.path.insert(0, ROOT)
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from src.main import app
+
+    statements = Counter()
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements[os.path.basename(conn.engine.url.database)] += 1
+
+    failures = []
+
+    def check(label, expect_primary, expect_replica, send):
+        statements.clear()
+        response = send()
+        used_primary = statements['primary.db'] > 0
+        used_replica = statements['replica.db'] > 0
+        ok = used_primary == expect_primary and used_replica == expect_replica and response.status_code < 400
+        print(f"{'ok  ' if ok else 'FAIL'} {label:<44} primary={statements['primary.db']:<3} "
+              f"replica={statements['replica.db']:<3} status={response.status_code}")
+        if not ok:
+            failures.append(label)
+        return response
+
+    reader = app.test_client()
+    writer = app.test_client()
+    check('GET /api/orders', False, True, lambda: reader.get('/api/orders'))
+    check('GET /api/orders/1', False, True, lambda: reader.get('/api/orders/1'))
+    check('GET /api/customers', False, True, lambda: reader.get('/api/customers'))
+    check('GET /api/orders/1/payments', False, True, lambda: reader.get('/api/orders/1/payments'))
+    check('GET /api/reports/revenue-by-status', False, True, lambda: reader.get('/api/reports/revenue-by-status'))
+    created = check('POST /api/orders', True, False, lambda: writer.post(
+        '/api/orders', json={'customer_id': 1, 'line_items': [{'product_id': 1, 'quantity': 1}]}
+    )).get_json()
+    order_url = f"/api/orders/{created['id']}"
+    check(f'GET {order_url} after the write', True, False, lambda: writer.get(order_url))
+
+    # The replica is a snapshot from before the write, so a client that did
+    # not write reads from it and does not see the new order yet
+    statements.clear()
+    lagging = reader.get(order_url)
+    print(f"{'ok  ' if lagging.status_code == 404 else 'FAIL'} {'GET ' + order_url + ' from another client':<44} "
+          f"primary={statements['primary.db']:<3} replica={statements['replica.db']:<3} status={lagging.status_code}")
+    if lagging.status_code != 404:
+        failures.append('stale read from replica')
+
+    # A cache miss reads from the primary; the lagging replica would
+    # otherwise fill the entry for the new version with the old price
+    check('GET /api/products/1 (cache fill)', True, False, lambda: reader.get('/api/products/1'))
+    check('GET /api/products/1 (cached)', False, False, lambda: reader.get('/api/products/1'))
+    check('PUT /api/products/1', True, False, lambda: writer.put('/api/products/1', json={'unit_price': 20}))
+    refreshed = check('GET /api/products/1 from another client', True, False, lambda: reader.get('/api/products/1'))
+    if refreshed.get_json()['unit_price'] != 20:
+        print(f"FAIL {'cached product after the write':<44} unit_price={refreshed.get_json()['unit_price']}")
+        failures.append('stale product cached from replica')
+
+    if failures:
+        sys.exit(f'{len(failures)} check(s) failed')
+    print('Reads are served by the replica; writes and read-your-writes use the primary')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Hammer create_order of the sample-data backend from threads and processes.
+
+Runs app.py twice: once with the in-memory Repository, driven by threads
+in one process, and once with DEMO_STORE_PATH set so every process shares
+one SQLiteRepository file, driven by threads in several processes. Each
+run checks that:
+
+- every POST /api/orders succeeded
+- no order id or order number was handed out twice
+- every created order is in the store, next to the seeded ones
+
+    python check_repository.py --workers 4 --threads 8 --orders 50
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import threading
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def load_app():
+    sys.path.insert(0, ROOT)
+    # app.py prints its environment on import
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+    return app
+
+def create_orders(threads, orders, results):
+    """Create ``orders`` orders from each of ``threads`` threads; put the responses on ``results``"""
+    app = load_app()
+    created = []
+    lock = threading.Lock()
+
+    def loop(index):
+        client = app.app.test_client()
+        for i in range(orders):
+            response = client.post('/api/orders', json={
+                'customer_id': 1 + (index + i) % 3,
+                'line_items': [{'product_id': 1, 'quantity': 1, 'unit_price': 10}]
+            })
+            body = response.get_json() or {}
+            with lock:
+                created.append((response.status_code, body.get('id'), body.get('order_number')))
+
+    workers = [threading.Thread(target=loop, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put(created)
+
+def check(label, created, stored_ids, seeded_ids):
+    ids = [order_id for _, order_id, _ in created]
+    numbers = [number for _, _, number in created]
+    checks = [
+        ('every create succeeded', all(status == 201 for status, _, _ in created)),
+        ('no duplicate ids', len(set(ids)) == len(ids)),
+        ('no duplicate order numbers', len(set(numbers)) == len(numbers)),
+        ('no id reused from the seed data', not set(ids) & seeded_ids),
+        ('every created order is stored', set(ids) | seeded_ids == set(stored_ids)),
+    ]
+    print(f'{label}: {len(created)} orders created, {len(stored_ids)} stored')
+    for name, ok in checks:
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+    return [name for name, ok in checks if not ok]
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrency check for the sample-data repository')
+    parser.add_argument('--workers', type=int, default=4, help='processes sharing the SQLite store')
+    parser.add_argument('--threads', type=int, default=8, help='threads per process')
+    parser.add_argument('--orders', type=int, default=50, help='orders created per thread')
+    args = parser.parse_args()
+    failures = []
+
+    # In-memory Repository: threads of one process
+    os.environ.pop('DEMO_STORE_PATH', None)
+    app = load_app()
+    seeded_ids = {order['id'] for order in app.store.orders.all()}
+    results = queue.Queue()
+    create_orders(args.threads, args.orders, results)
+    created = results.get()
+    failures += check(f'Repository, {args.threads} threads', created,
+                      [order['id'] for order in app.store.orders.all()], seeded_ids)
+
+    # SQLiteRepository: threads of several processes sharing one file
+    os.environ['DEMO_STORE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='check-repository-'), 'store.db')
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = [
+        context.Process(target=create_orders, args=(args.threads, args.orders, results))
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    created = []
+    for _ in processes:
+        created.extend(results.get())
+    for process in processes:
+        process.join()
+
+    from repository import SQLiteRepository
+    store = SQLiteRepository(os.environ['DEMO_STORE_PATH'])
+    failures += check(f'SQLiteRepository, {args.workers} processes x {args.threads} threads', created,
+                      [order['id'] for order in store.orders.all()], seeded_ids)
+
+    if failures:
+        sys.exit(f'{len(failures)} check(s) failed')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# Pre-encoded JSON payloads for the sample-data list endpoints
+#
+# A Payload holds a response body that has already been serialized, its
+# ETag, and compressed variants that are built the first time a client asks
+# for them. Serving a cached payload copies bytes instead of re-encoding
+# the collection. Build a new Payload whenever the collection changes.
+
+import gzip
+import hashlib
+import threading
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are always sent uncompressed
+MIN_COMPRESS_SIZE = 1024
+
+# Content codings in order of preference
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def _compress(encoding, body):
+    if encoding == 'br':
+        return brotli.compress(body)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+def accepted_encodings(header):
+    """Parse an Accept-Encoding header into {coding: q}"""
+    accepted = {}
+    for part in (header or '').split(','):
+        name, _, params = part.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or any(tag.removeprefix('W/').strip('"') == etag for tag in tags)
+
+class Payload:
+    """An encoded response body with its ETag and pre-compressed variants"""
+
+    def __init__(self, body, mimetype='application/json'):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(body).hexdigest()
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    def variant(self, encoding):
+        """The body compressed with ``encoding``, compressed once and then reused"""
+        compressed = self._variants.get(encoding)
+        if compressed is None:
+            with self._lock:
+                compressed = self._variants.get(encoding)
+                if compressed is None:
+                    compressed = self._variants[encoding] = _compress(encoding, self.body)
+        return compressed
+
+    def negotiate(self, accept_encoding):
+        """The preferred content coding the client accepts, or None for identity"""
+        if len(self.body) < MIN_COMPRESS_SIZE:
+            return None
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in ENCODINGS:
+            if accepted.get(encoding, accepted.get('*', 0)) > 0:
+                return encoding
+        return None
+
+    def respond(self, if_none_match=None, accept_encoding=None):
+        """``(status, body, headers)`` for a request with the given headers.
+
+        Each content coding has its own ETag. A matching If-None-Match gets
+        an empty 304.
+        """
+        encoding = self.negotiate(accept_encoding)
+        etag = f'{self.etag}-{encoding}' if encoding else self.etag
+        headers = {'ETag': f'"{etag}"', 'Vary': 'Accept-Encoding'}
+        if _etag_matches(if_none_match, etag):
+            return 304, b'', headers
+        if encoding is None:
+            return 200, self.body, headers
+        headers['Content-Encoding'] = encoding
+        return 200, self.variant(encoding), headers
@@ -0,0 +1,284 @@
+# In-memory repository for the sample-data backend (app.py)
+#
+# Records are plain dicts, indexed by id so lookups, inserts and updates do
+# not scan the whole collection. Orders are also indexed by customer_id and
+# status, and new ids come from a counter instead of max(ids) + 1.
+#
+# Repository keeps everything in process memory and is safe to share between
+# threads. Under several worker processes each worker would hold its own
+# diverging copy, so SQLiteRepository stores the same collections in one
+# SQLite database file (in WAL mode) that all workers share.
+#
+# Stored records are never modified in place: updates replace a record with
+# a changed copy. Readers take a Snapshot, an immutable view of a collection
+# at one version, which stays consistent while writers carry on and caches
+# its encoded form until the next write publishes a new version.
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class Snapshot:
+    """Immutable view of a collection's records at one version"""
+
+    __slots__ = ('version', 'records', '_encoded')
+
+    def __init__(self, version, records):
+        self.version = version
+        self.records = tuple(records)
+        self._encoded = None
+
+    def encoded(self, encode):
+        """``encode(records)``, computed on first use and reused for this version"""
+        if self._encoded is None:
+            self._encoded = encode(self.records)
+        return self._encoded
+
+
+class Collection:
+    """Records of one kind, indexed by id and by any ``indexed`` fields"""
+
+    def __init__(self, records=(), indexed=()):
+        self._by_id = {}
+        # field -> value -> {id: record}; inner dicts keep insertion order
+        self._indexes = {field: {} for field in indexed}
+        self._next_id = 1
+        self._lock = threading.RLock()
+        self.version = 0
+        self._snapshot = Snapshot(0, ())
+        for record in records:
+            self.add(dict(record))
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def snapshot(self):
+        """The current Snapshot; built at most once per version"""
+        snapshot = self._snapshot
+        if snapshot.version == self.version:
+            return snapshot
+        with self._lock:
+            if self._snapshot.version != self.version:
+                self._snapshot = Snapshot(self.version, self._by_id.values())
+            return self._snapshot
+
+    def all(self):
+        return list(self.snapshot().records)
+
+    def get(self, record_id):
+        return self._by_id.get(record_id)
+
+    def find(self, **criteria):
+        """Records whose indexed fields equal the given values, in insertion order"""
+        if not criteria:
+            return self.all()
+        with self._lock:
+            buckets = sorted(
+                (self._indexes[field].get(value, {}) for field, value in criteria.items()),
+                key=len
+            )
+            smallest, others = buckets[0], buckets[1:]
+            return [
+                record for record_id, record in smallest.items()
+                if all(record_id in bucket for bucket in others)
+            ]
+
+    def next_id(self):
+        """Reserve the next id; ids are never reused"""
+        with self._lock:
+            record_id = self._next_id
+            self._next_id += 1
+            return record_id
+
+    def add(self, record):
+        """Store ``record``, assigning it an id if it has none.
+
+        The collection takes ownership of the dict; it must not be modified
+        afterwards.
+        """
+        with self._lock:
+            if record.get('id') is None:
+                record['id'] = self.next_id()
+            self._next_id = max(self._next_id, record['id'] + 1)
+            self._by_id[record['id']] = record
+            for field, index in self._indexes.items():
+                index.setdefault(record.get(field), {})[record['id']] = record
+            self.version += 1
+            return record
+
+    def update(self, record_id, changes):
+        """Replace a record with a copy that has ``changes`` applied; None if missing"""
+        with self._lock:
+            old = self._by_id.get(record_id)
+            if old is None:
+                return None
+            record = {**old, **{k: v for k, v in changes.items() if k != 'id'}}
+            self._by_id[record_id] = record
+            for field, index in self._indexes.items():
+                if record.get(field) != old.get(field):
+                    bucket = index[old.get(field)]
+                    del bucket[record_id]
+                    if not bucket:
+                        del index[old.get(field)]
+                index.setdefault(record.get(field), {})[record_id] = record
+            self.version += 1
+            return record
+
+
+class Repository:
+    """The customers, products and orders served by app.py"""
+
+    def __init__(self, customers=(), products=(), orders=()):
+        self.customers = Collection(customers)
+        self.products = Collection(products)
+        self.orders = Collection(orders, indexed=('customer_id', 'status'))
+
+
+class SQLiteCollection:
+    """Collection stored as JSON documents in a table of a shared SQLite database.
+
+    Indexed fields are copied into their own indexed columns. Ids come from
+    a row in the ``sequences`` table that is incremented inside a write
+    transaction, so concurrent processes never hand out the same id.
+    """
+
+    def __init__(self, repository, name, records=(), indexed=()):
+        self._repository = repository
+        self.name = name
+        self.indexed = tuple(indexed)
+        self._version_key = f'{name}:version'
+        self._snapshot = Snapshot(-1, ())
+        with repository.transaction() as conn:
+            columns = ''.join(f', {field}' for field in self.indexed)
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {name} (id INTEGER PRIMARY KEY{columns}, doc TEXT NOT NULL)')
+            for field in self.indexed:
+                conn.execute(f'CREATE INDEX IF NOT EXISTS ix_{name}_{field} ON {name} ({field}, id)')
+            conn.execute('INSERT OR IGNORE INTO sequences (name, value) VALUES (?, 0)', (name,))
+            conn.execute('INSERT OR IGNORE INTO sequences (name, value) VALUES (?, 0)', (self._version_key,))
+            # Only the first worker to start seeds the shared tables
+            if conn.execute(f'SELECT 1 FROM {name} LIMIT 1').fetchone() is None:
+                for record in records:
+                    self._insert(conn, dict(record))
+
+    def __len__(self):
+        return self._repository.connection().execute(f'SELECT COUNT(*) FROM {self.name}').fetchone()[0]
+
+    def _reserve(self, conn):
+        return conn.execute(
+            'UPDATE sequences SET value = value + 1 WHERE name = ? RETURNING value', (self.name,)
+        ).fetchone()[0]
+
+    def _insert(self, conn, record):
+        if record.get('id') is None:
+            record['id'] = self._reserve(conn)
+        columns = ('id',) + self.indexed + ('doc',)
+        conn.execute(
+            f"INSERT OR REPLACE INTO {self.name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            (record['id'], *[record.get(field) for field in self.indexed], json.dumps(record))
+        )
+        conn.execute(
+            'UPDATE sequences SET value = MAX(value, ?) WHERE name = ?', (record['id'], self.name)
+        )
+        conn.execute('UPDATE sequences SET value = value + 1 WHERE name = ?', (self._version_key,))
+        return record
+
+    def _version(self, conn):
+        return conn.execute('SELECT value FROM sequences WHERE name = ?', (self._version_key,)).fetchone()[0]
+
+    def _select(self, where='', params=()):
+        rows = self._repository.connection().execute(
+            f'SELECT doc FROM {self.name}{where} ORDER BY id', params
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def snapshot(self):
+        """The current Snapshot, shared by this process's threads until another write lands"""
+        conn = self._repository.connection()
+        snapshot = self._snapshot
+        if snapshot.version == self._version(conn):
+            return snapshot
+        # Read the version and the records in one read transaction so they match
+        conn.execute('BEGIN')
+        try:
+            snapshot = Snapshot(self._version(conn), self._select())
+        finally:
+            conn.execute('COMMIT')
+        self._snapshot = snapshot
+        return snapshot
+
+    def all(self):
+        return self._select()
+
+    def get(self, record_id):
+        records = self._select(' WHERE id = ?', (record_id,))
+        return records[0] if records else None
+
+    def find(self, **criteria):
+        for field in criteria:
+            if field not in self.indexed:
+                raise KeyError(field)
+        where = ' AND '.join(f'{field} = ?' for field in criteria)
+        return self._select(f' WHERE {where}' if where else '', tuple(criteria.values()))
+
+    def next_id(self):
+        """Reserve the next id; ids are never reused"""
+        with self._repository.transaction() as conn:
+            return self._reserve(conn)
+
+    def add(self, record):
+        """Store ``record``, assigning it an id if it has none"""
+        with self._repository.transaction() as conn:
+            return self._insert(conn, record)
+
+    def update(self, record_id, changes):
+        """Apply ``changes`` to a record; None if missing"""
+        with self._repository.transaction() as conn:
+            row = conn.execute(f'SELECT doc FROM {self.name} WHERE id = ?', (record_id,)).fetchone()
+            if row is None:
+                return None
+            record = json.loads(row[0])
+            record.update({k: v for k, v in changes.items() if k != 'id'})
+            return self._insert(conn, record)
+
+
+class SQLiteRepository:
+    """Repository shared by every worker process through one SQLite file.
+
+    Each thread gets its own connection. WAL mode lets readers run while a
+    writer holds the write lock, and writers wait up to ``busy_timeout``
+    milliseconds for each other instead of failing.
+    """
+
+    def __init__(self, path, customers=(), products=(), orders=(), busy_timeout=5000):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        with self.transaction() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS sequences (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        self.customers = SQLiteCollection(self, 'customers', customers)
+        self.products = SQLiteCollection(self, 'products', products)
+        self.orders = SQLiteCollection(self, 'orders', orders, indexed=('customer_id', 'status'))
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=self.busy_timeout / 1000)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout)}')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction that takes the database write lock up front"""
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
@@ -7,15 +7,23 @@ from flask import Flask, send_from_directory
 # from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from src.models.database import db
+from src.models.engine import database_uri, engine_options, replica_binds
+from src.models.replicas import install_read_your_writes
+from src.models.migrations import run_migrations
+from src.models.search import install_search_index
 from src.models.user import bcrypt
 from src.routes.auth import auth_bp
 from src.routes.customers import customers_bp
 from src.routes.products import products_bp
 from src.routes.orders import orders_bp
 from src.routes.payments import payments_bp
+from src.routes.reports import reports_bp
+from src.utils.identity import install_user_loader
+from src.utils.json_provider import FastJSONProvider
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+app.json = FastJSONProvider(app)
 
 # Enable CORS for all routes
 # CORS(app)
@@ -30,20 +38,36 @@ app.register_blueprint(customers_bp, url_prefix='/api')
 app.register_blueprint(products_bp, url_prefix='/api')
 app.register_blueprint(orders_bp, url_prefix='/api')
 app.register_blueprint(payments_bp, url_prefix='/api')
+app.register_blueprint(reports_bp, url_prefix='/api')
 app.register_blueprint(auth_bp, url_prefix='/api')
 
 # Database configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+app.config['SQLALCHEMY_DATABASE_URI'] = database_uri(
+    f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+# GET requests read from these replicas when DATABASE_REPLICA_URLS is set
+app.config['SQLALCHEMY_BINDS'] = replica_binds()
+if app.config['SQLALCHEMY_BINDS']:
+    install_read_your_writes(app, seconds=int(os.environ.get('REPLICA_READ_YOUR_WRITES_SECONDS', 10)))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
+# bcrypt cost for new hashes; logins upgrade hashes stored at any other cost.
+# Pick it with `flask --app src.main auth benchmark-hash`.
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+# /api/auth/metrics is disabled unless this is set; callers send it as X-Metrics-Token
+app.config['AUTH_METRICS_TOKEN'] = os.environ.get('AUTH_METRICS_TOKEN')
 bcrypt.init_app(app)
 
 # JWT Configuration
 app.config['JWT_SECRET_KEY'] = 'super-secret'  # Change this in your production environment!
 jwt = JWTManager(app)
+install_user_loader(jwt)
 
 with app.app_context():
     db.create_all()
+    run_migrations(db.engine)
+    install_search_index(db.engine)
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -1,10 +1,47 @@
+import re
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from src.models.replicas import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Where each driver names the columns of a violated unique constraint:
+#   SQLite      UNIQUE constraint failed: user.username, user.email
+#   PostgreSQL  duplicate key value violates unique constraint "user_email_key"
+#               DETAIL:  Key (email)=(someone@example.com) already exists.
+#   MySQL       Duplicate entry 'someone@example.com' for key 'user.email'
+_UNIQUE_COLUMNS = (
+    re.compile(r'UNIQUE constraint failed: ([^\n]+)'),
+    re.compile(r'Key \(([^)]+)\)='),
+    re.compile(r"for key '([^']+)'"),
+)
+_UNIQUE_CONSTRAINT = re.compile(r'unique constraint "([^"]+)"')
+
+def duplicate_column(error, *columns):
+    """Which of ``columns`` a unique-constraint IntegrityError is about, if any.
+
+    Only the column and constraint names in the driver's message are
+    matched, never the conflicting values it may quote.
+    """
+    message = str(error.orig)
+    named = set()
+    for pattern in _UNIQUE_COLUMNS:
+        for match in pattern.findall(message):
+            named.update(name.strip().strip('"`').rsplit('.', 1)[-1] for name in match.split(','))
+    for column in columns:
+        if column in named:
+            return column
+    # PostgreSQL without a DETAIL line: default constraint names end in _<column>_key
+    constraint = _UNIQUE_CONSTRAINT.search(message)
+    if constraint:
+        return next((column for column in columns if constraint.group(1).endswith(f'_{column}_key')), None)
+    return None
 
 class Customer(db.Model):
     __tablename__ = 'customers'
+    __table_args__ = (
+        db.Index('ix_customers_email', 'email'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_name = db.Column(db.String(200), nullable=False)
@@ -26,8 +63,8 @@ class Customer(db.Model):
             'email': self.email,
             'phone': self.phone,
             'billing_address': self.billing_address,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 class Product(db.Model):
@@ -51,14 +88,20 @@ class Product(db.Model):
             'sku': self.sku,
             'product_name': self.product_name,
             'description': self.description,
-            'unit_price': float(self.unit_price),
+            'unit_price': self.unit_price,
             'inventory_quantity': self.inventory_quantity,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 class SalesOrder(db.Model):
     __tablename__ = 'sales_orders'
+    __table_args__ = (
+        db.Index('ix_sales_orders_created_at_id', 'created_at', 'id'),
+        db.Index('ix_sales_orders_status_created_at', 'status', 'created_at'),
+        db.Index('ix_sales_orders_customer_id_created_at', 'customer_id', 'created_at'),
+        db.Index('ix_sales_orders_order_date', 'order_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_number = db.Column(db.String(50), unique=True, nullable=False)
@@ -67,6 +110,7 @@ class SalesOrder(db.Model):
     status = db.Column(db.String(20), default='unissued')  # unissued, issued, complete, voided
     total_amount = db.Column(db.Numeric(10, 2), default=0)
     payment_status = db.Column(db.String(20), default='unpaid')  # unpaid, partial, paid
+    paid_amount = db.Column(db.Numeric(10, 2), nullable=False, default=0)  # sum of payments, kept in step by payments.py
     delivery_address = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -81,19 +125,24 @@ class SalesOrder(db.Model):
             'order_number': self.order_number,
             'customer_id': self.customer_id,
             'customer': self.customer.to_dict() if self.customer else None,
-            'order_date': self.order_date.isoformat() if self.order_date else None,
+            'order_date': self.order_date,
             'status': self.status,
-            'total_amount': float(self.total_amount),
+            'total_amount': self.total_amount,
             'payment_status': self.payment_status,
+            'paid_amount': self.paid_amount,
             'delivery_address': self.delivery_address,
             'line_items': [item.to_dict() for item in self.line_items],
             'payments': [payment.to_dict() for payment in self.payments],
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
 class OrderLineItem(db.Model):
     __tablename__ = 'order_line_items'
+    __table_args__ = (
+        db.Index('ix_order_line_items_order_id', 'order_id'),
+        db.Index('ix_order_line_items_product_id', 'product_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('sales_orders.id'), nullable=False)
@@ -111,14 +160,17 @@ class OrderLineItem(db.Model):
             'product_id': self.product_id,
             'product': self.product.to_dict() if self.product else None,
             'quantity': self.quantity,
-            'unit_price': float(self.unit_price),
-            'line_total': float(self.line_total),
+            'unit_price': self.unit_price,
+            'line_total': self.line_total,
             'fulfillment_status': self.fulfillment_status,
             'fulfilled_quantity': self.fulfilled_quantity
         }
 
 class Payment(db.Model):
     __tablename__ = 'payments'
+    __table_args__ = (
+        db.Index('ix_payments_order_id', 'order_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('sales_orders.id'), nullable=False)
@@ -132,10 +184,46 @@ class Payment(db.Model):
         return {
             'id': self.id,
             'order_id': self.order_id,
-            'payment_amount': float(self.payment_amount),
-            'payment_date': self.payment_date.isoformat() if self.payment_date else None,
+            'payment_amount': self.payment_amount,
+            'payment_date': self.payment_date,
             'payment_method': self.payment_method,
             'reference_number': self.reference_number,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
+
+class DailySalesRollup(db.Model):
+    """Quantity and revenue of non-voided orders per order day, customer and product"""
+    __tablename__ = 'daily_sales_rollups'
+    
+    day = db.Column(db.Date, primary_key=True)
+    customer_id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+class DailyStatusRollup(db.Model):
+    """Order count, total and amount paid per order day, customer and current status"""
+    __tablename__ = 'daily_status_rollups'
+    
+    day = db.Column(db.Date, primary_key=True)
+    customer_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    total_amount = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    paid_amount = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+class IdempotencyKey(db.Model):
+    """Response stored for an Idempotency-Key until ``expires_at``; no response while in progress"""
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+    
+    idempotency_key = db.Column(db.String(100), primary_key=True)
+    path = db.Column(db.String(200), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,85 @@
+import os
+import sqlite3
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from src.models.replicas import REPLICA_BIND_PREFIX
+
+# Engine settings are read from the environment so each deployment can size
+# its pool without code changes:
+#
+#   DATABASE_URL          database URI (defaults to the bundled SQLite file)
+#   DB_POOL_SIZE          connections kept open per worker process
+#   DB_MAX_OVERFLOW       extra connections allowed above DB_POOL_SIZE
+#   DB_POOL_TIMEOUT       seconds to wait for a free connection
+#   DB_POOL_RECYCLE       seconds before a server connection is replaced
+#   DATABASE_REPLICA_URLS comma-separated URIs of read replicas
+#
+# SQLite connections also get these PRAGMAs, each overridable by setting
+# SQLITE_<NAME> (e.g. SQLITE_JOURNAL_MODE=DELETE).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',          # readers don't block the writer or each other
+    'synchronous': 'NORMAL',        # fsync at checkpoints instead of every commit; safe with WAL
+    'busy_timeout': '5000',         # wait up to 5s for the write lock instead of failing
+    'mmap_size': str(256 * 1024 * 1024)
+}
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+def normalize_uri(uri):
+    # Hosting providers still hand out the scheme SQLAlchemy 1.4 dropped
+    if uri.startswith('postgres://'):
+        return 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+def database_uri(default):
+    """Database URI from DATABASE_URL, falling back to ``default``"""
+    return normalize_uri(os.environ.get('DATABASE_URL') or default)
+
+def replica_binds():
+    """SQLALCHEMY_BINDS entries for the replicas listed in DATABASE_REPLICA_URLS"""
+    uris = [uri.strip() for uri in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if uri.strip()]
+    return {
+        f'{REPLICA_BIND_PREFIX}{index}': normalize_uri(uri)
+        for index, uri in enumerate(uris)
+    }
+
+def pool_capacity():
+    """Most connections one worker process opens: DB_POOL_SIZE + DB_MAX_OVERFLOW"""
+    return _env_int('DB_POOL_SIZE', 5) + _env_int('DB_MAX_OVERFLOW', 10)
+
+def engine_options(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for ``uri``"""
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            # In-memory databases use a single shared connection
+            return {}
+        return {
+            'pool_size': _env_int('DB_POOL_SIZE', 5),
+            'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+            'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30)
+        }
+    return {
+        'pool_size': _env_int('DB_POOL_SIZE', 5),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': True
+    }
+
+def sqlite_pragmas():
+    return {
+        name: os.environ.get(f'SQLITE_{name.upper()}', default)
+        for name, default in SQLITE_PRAGMAS.items()
+    }
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply SQLITE_PRAGMAS to every new SQLite connection"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in sqlite_pragmas().items():
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
@@ -0,0 +1,87 @@
+from sqlalchemy import func, update
+from src.models.database import db, OrderLineItem, Product, SalesOrder
+
+class InsufficientInventory(Exception):
+    """Raised when one or more products cannot cover an order's demand"""
+
+    def __init__(self, shortfalls):
+        self.shortfalls = shortfalls
+        super().__init__('; '.join(
+            f"Insufficient inventory for {s['product_name']}. "
+            f"Available: {s['available']}, Required: {s['required']}"
+            for s in shortfalls
+        ))
+
+def order_demand(order_id):
+    """Total quantity of each product required by an order's line items"""
+    rows = (
+        db.session.query(OrderLineItem.product_id, func.sum(OrderLineItem.quantity))
+        .filter(OrderLineItem.order_id == order_id)
+        .group_by(OrderLineItem.product_id)
+        .all()
+    )
+    return {product_id: int(quantity) for product_id, quantity in rows}
+
+def transition_status(order_id, from_status, to_status):
+    """Move an order from ``from_status`` to ``to_status`` if it is still there.
+
+    Returns False when another request changed the status first, so only
+    one of several concurrent issue/void calls goes on to touch inventory.
+    """
+    result = db.session.execute(
+        update(SalesOrder)
+        .where(SalesOrder.id == order_id, SalesOrder.status == from_status)
+        .values(status=to_status)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+def reserve_inventory(demand):
+    """Take ``demand`` ({product_id: quantity}) out of stock in the current transaction.
+
+    Each product is decremented with a conditional UPDATE that only applies
+    while enough stock remains, so concurrent workers can never oversell.
+    Products are updated in id order to keep lock acquisition consistent.
+    Raises InsufficientInventory listing every product that came up short;
+    the caller must then roll back.
+    """
+    short = {}
+    for product_id in sorted(demand):
+        quantity = demand[product_id]
+        result = db.session.execute(
+            update(Product)
+            .where(Product.id == product_id, Product.inventory_quantity >= quantity)
+            .values(inventory_quantity=Product.inventory_quantity - quantity)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            short[product_id] = quantity
+
+    if short:
+        rows = (
+            db.session.query(Product.id, Product.sku, Product.product_name, Product.inventory_quantity)
+            .filter(Product.id.in_(short))
+            .order_by(Product.id)
+            .all()
+        )
+        raise InsufficientInventory([
+            {
+                'product_id': row.id,
+                'sku': row.sku,
+                'product_name': row.product_name,
+                'available': row.inventory_quantity or 0,
+                'required': short[row.id],
+                'shortfall': short[row.id] - (row.inventory_quantity or 0)
+            }
+            for row in rows
+        ])
+
+def release_inventory(demand):
+    """Return ``demand`` ({product_id: quantity}) to stock in the current transaction"""
+    for product_id in sorted(demand):
+        db.session.execute(
+            update(Product)
+            .where(Product.id == product_id)
+            .values(inventory_quantity=Product.inventory_quantity + demand[product_id])
+            .execution_options(synchronize_session=False)
+        )
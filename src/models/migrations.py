@@ -0,0 +1,92 @@
+from datetime import datetime
+from sqlalchemy import inspect, text
+
+def add_column(table, column, ddl):
+    """Migration step that adds ``column`` to ``table`` unless it already exists"""
+    def step(conn):
+        if column not in {c['name'] for c in inspect(conn).get_columns(table)}:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return step
+
+# Versioned schema changes for databases created before the change landed.
+# db.create_all() builds new databases from the models directly, so every
+# step here must be safe to run against a schema that already has it. A
+# step is either a SQL string or a callable taking the connection.
+# Append new migrations with the next version number; never edit old ones.
+MIGRATIONS = [
+    (1, 'Indexes for order, line item, payment and customer lookups', [
+        "CREATE INDEX IF NOT EXISTS ix_customers_email ON customers (email)",
+        "CREATE INDEX IF NOT EXISTS ix_sales_orders_created_at_id ON sales_orders (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_sales_orders_status_created_at ON sales_orders (status, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_sales_orders_customer_id_created_at ON sales_orders (customer_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_order_line_items_order_id ON order_line_items (order_id)",
+        "CREATE INDEX IF NOT EXISTS ix_order_line_items_product_id ON order_line_items (product_id)",
+        "CREATE INDEX IF NOT EXISTS ix_payments_order_id ON payments (order_id)",
+    ]),
+    (2, 'Maintained paid_amount on sales orders', [
+        add_column('sales_orders', 'paid_amount', 'NUMERIC(10, 2) NOT NULL DEFAULT 0'),
+        "UPDATE sales_orders SET paid_amount = COALESCE("
+        "(SELECT SUM(payment_amount) FROM payments WHERE payments.order_id = sales_orders.id), 0)",
+    ]),
+    (3, 'Index on order date for report date ranges', [
+        "CREATE INDEX IF NOT EXISTS ix_sales_orders_order_date ON sales_orders (order_date)",
+    ]),
+    (4, 'Daily sales and status rollups', [
+        "CREATE TABLE IF NOT EXISTS daily_sales_rollups ("
+        "day DATE NOT NULL, customer_id INTEGER NOT NULL, product_id INTEGER NOT NULL, "
+        "quantity INTEGER NOT NULL, revenue NUMERIC(12, 2) NOT NULL, "
+        "PRIMARY KEY (day, customer_id, product_id))",
+        "CREATE TABLE IF NOT EXISTS daily_status_rollups ("
+        "day DATE NOT NULL, customer_id INTEGER NOT NULL, status VARCHAR(20) NOT NULL, "
+        "order_count INTEGER NOT NULL, total_amount NUMERIC(12, 2) NOT NULL, paid_amount NUMERIC(12, 2) NOT NULL, "
+        "PRIMARY KEY (day, customer_id, status))",
+        "DELETE FROM daily_sales_rollups",
+        "DELETE FROM daily_status_rollups",
+        "INSERT INTO daily_sales_rollups (day, customer_id, product_id, quantity, revenue) "
+        "SELECT date(o.order_date), o.customer_id, li.product_id, SUM(li.quantity), SUM(li.line_total) "
+        "FROM order_line_items li JOIN sales_orders o ON o.id = li.order_id "
+        "WHERE o.status != 'voided' "
+        "GROUP BY date(o.order_date), o.customer_id, li.product_id",
+        "INSERT INTO daily_status_rollups (day, customer_id, status, order_count, total_amount, paid_amount) "
+        "SELECT date(order_date), customer_id, status, COUNT(*), SUM(total_amount), SUM(paid_amount) "
+        "FROM sales_orders GROUP BY date(order_date), customer_id, status",
+    ]),
+    (5, 'Idempotency keys for order and payment creation', [
+        "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+        "idempotency_key VARCHAR(100) NOT NULL, path VARCHAR(200) NOT NULL, request_hash VARCHAR(64) NOT NULL, "
+        "status_code INTEGER, response_body TEXT, "
+        "created_at TIMESTAMP NOT NULL, expires_at TIMESTAMP NOT NULL, "
+        "PRIMARY KEY (idempotency_key, path))",
+        "CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys (expires_at)",
+    ]),
+]
+
+def applied_versions(conn):
+    """Return the set of migration versions already applied to the database"""
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, description VARCHAR(200) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+    ))
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+def run_migrations(engine):
+    """Apply pending migrations in version order, one transaction each"""
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+
+    applied = []
+    for version, description, statements in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            for step in statements:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(text(step))
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {'v': version, 'd': description, 't': datetime.utcnow()}
+            )
+        applied.append(version)
+    return applied
@@ -0,0 +1,79 @@
+import random
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Select
+
+# Read replicas are configured as SQLAlchemy binds named replica_0,
+# replica_1, ... (see engine.replica_binds). Plain SELECTs issued while
+# handling a GET or HEAD request go to one of them; everything else, and
+# every statement outside a request (CLI commands, startup), goes to the
+# primary.
+REPLICA_BIND_PREFIX = 'replica_'
+READ_METHODS = ('GET', 'HEAD')
+
+# After a successful write, the client is sent this cookie and its reads stay
+# on the primary until it expires, so it sees its own writes even when the
+# replicas lag behind.
+PRIMARY_COOKIE = 'db_read_primary'
+
+def replica_keys(engines):
+    return sorted(key for key in engines if key and key.startswith(REPLICA_BIND_PREFIX))
+
+def reads_allowed_on_replica():
+    return (
+        has_request_context()
+        and request.method in READ_METHODS
+        and PRIMARY_COOKIE not in request.cookies
+        and not g.get('read_from_primary')
+    )
+
+def read_from_primary():
+    """Send the rest of the current request's reads to the primary"""
+    g.read_from_primary = True
+
+class RoutingSession(Session):
+    """Session that sends read-only queries of read requests to a replica.
+
+    A session picks one replica and uses it for all its reads, so a request
+    sees a single consistent replica. Flushes, writes, ``SELECT ... FOR
+    UPDATE`` and raw SQL always use the primary. Once a session has written,
+    its later reads use the primary as well.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._reads_from_replica(clause):
+                replica = self._replica()
+                if replica is not None:
+                    return replica
+            elif self._flushing or (clause is not None and not isinstance(clause, Select)):
+                self.info['wrote'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause):
+        return (
+            isinstance(clause, Select)
+            and clause._for_update_arg is None
+            and not self._flushing
+            and not self.info.get('wrote')
+            and reads_allowed_on_replica()
+        )
+
+    def _replica(self):
+        engines = self._db.engines
+        key = self.info.get('replica')
+        if key is None:
+            keys = replica_keys(engines)
+            if not keys:
+                return None
+            key = self.info['replica'] = random.choice(keys)
+        return engines[key]
+
+def install_read_your_writes(app, seconds=10):
+    """Keep a client's reads on the primary for ``seconds`` after each successful write"""
+    @app.after_request
+    def pin_reads_to_primary(response):
+        if request.method not in READ_METHODS and response.status_code < 400:
+            response.set_cookie(PRIMARY_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+        return response
+    return pin_reads_to_primary
@@ -0,0 +1,211 @@
+from datetime import date
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from src.models.database import db, DailySalesRollup, DailyStatusRollup, OrderLineItem, SalesOrder
+
+# Rollups are maintained incrementally from the order and payment write
+# paths in the same transaction as the change they summarise. Reports read
+# them instead of scanning sales_orders and order_line_items, so historical
+# report queries do not grow with the number of orders.
+
+SALES_KEYS = ('day', 'customer_id', 'product_id')
+SALES_MEASURES = ('quantity', 'revenue')
+STATUS_KEYS = ('day', 'customer_id', 'status')
+STATUS_MEASURES = ('order_count', 'total_amount', 'paid_amount')
+
+# Maximum number of order ids bound into one IN (...) clause
+IN_CHUNK_SIZE = 500
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+def _chunks(order_ids):
+    order_ids = sorted(order_ids)
+    for start in range(0, len(order_ids), IN_CHUNK_SIZE):
+        yield order_ids[start:start + IN_CHUNK_SIZE]
+
+def sales_rows(order_ids=None):
+    """Aggregate line items of non-voided orders into daily sales rollup rows"""
+    day = func.date(SalesOrder.order_date)
+    query = (
+        db.session.query(
+            day,
+            SalesOrder.customer_id,
+            OrderLineItem.product_id,
+            func.sum(OrderLineItem.quantity),
+            func.sum(OrderLineItem.line_total)
+        )
+        .join(SalesOrder, SalesOrder.id == OrderLineItem.order_id)
+        .filter(SalesOrder.status != 'voided')
+        .group_by(day, SalesOrder.customer_id, OrderLineItem.product_id)
+    )
+    batches = [query] if order_ids is None else [
+        query.filter(SalesOrder.id.in_(chunk)) for chunk in _chunks(order_ids)
+    ]
+    return [
+        {
+            'day': _as_date(row[0]),
+            'customer_id': row[1],
+            'product_id': row[2],
+            'quantity': int(row[3] or 0),
+            'revenue': row[4] or 0
+        }
+        for batch in batches for row in batch
+    ]
+
+def status_rows(order_ids=None):
+    """Aggregate orders into daily status rollup rows"""
+    day = func.date(SalesOrder.order_date)
+    query = (
+        db.session.query(
+            day,
+            SalesOrder.customer_id,
+            SalesOrder.status,
+            func.count(SalesOrder.id),
+            func.sum(SalesOrder.total_amount),
+            func.sum(SalesOrder.paid_amount)
+        )
+        .group_by(day, SalesOrder.customer_id, SalesOrder.status)
+    )
+    batches = [query] if order_ids is None else [
+        query.filter(SalesOrder.id.in_(chunk)) for chunk in _chunks(order_ids)
+    ]
+    return [
+        {
+            'day': _as_date(row[0]),
+            'customer_id': row[1],
+            'status': row[2],
+            'order_count': row[3],
+            'total_amount': row[4] or 0,
+            'paid_amount': row[5] or 0
+        }
+        for batch in batches for row in batch
+    ]
+
+def _negate(rows, keys):
+    return [{k: v if k in keys else -v for k, v in row.items()} for row in rows]
+
+def _increment(model, keys, rows):
+    """Add each row's measures onto the rollup row with the same key, creating it if needed"""
+    if not rows:
+        return
+    measures = [name for name in rows[0] if name not in keys]
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: getattr(model, name) + getattr(stmt.excluded, name) for name in measures}
+        )
+        db.session.execute(stmt, rows)
+        return
+
+    for row in rows:
+        updated = (
+            db.session.query(model)
+            .filter(*[getattr(model, k) == row[k] for k in keys])
+            .update({name: getattr(model, name) + row[name] for name in measures}, synchronize_session=False)
+        )
+        if not updated:
+            db.session.add(model(**row))
+            db.session.flush()
+
+def add_orders(order_ids, sign=1):
+    """Count newly created orders into both rollups (``sign=-1`` removes them)"""
+    sales = sales_rows(order_ids)
+    statuses = status_rows(order_ids)
+    if sign < 0:
+        sales, statuses = _negate(sales, SALES_KEYS), _negate(statuses, STATUS_KEYS)
+    _increment(DailySalesRollup, SALES_KEYS, sales)
+    _increment(DailyStatusRollup, STATUS_KEYS, statuses)
+
+def move_status(order_id, old_status):
+    """Move an order from ``old_status`` to its current status in the rollups.
+
+    Call after the status change. Voiding takes the order's line items out
+    of the sales rollup.
+    """
+    moved = status_rows([order_id])
+    _increment(DailyStatusRollup, STATUS_KEYS, moved)
+    _increment(DailyStatusRollup, STATUS_KEYS, _negate(
+        [dict(row, status=old_status) for row in moved], STATUS_KEYS
+    ))
+
+    new_status = moved[0]['status'] if moved else old_status
+    if new_status == 'voided' and old_status != 'voided':
+        # sales_rows skips voided orders, so compute the lines being removed
+        # as if the order were still in its previous status
+        day = moved[0]['day']
+        customer_id = moved[0]['customer_id']
+        lines = (
+            db.session.query(
+                OrderLineItem.product_id,
+                func.sum(OrderLineItem.quantity),
+                func.sum(OrderLineItem.line_total)
+            )
+            .filter(OrderLineItem.order_id == order_id)
+            .group_by(OrderLineItem.product_id)
+            .all()
+        )
+        _increment(DailySalesRollup, SALES_KEYS, [
+            {
+                'day': day,
+                'customer_id': customer_id,
+                'product_id': product_id,
+                'quantity': -int(quantity or 0),
+                'revenue': -(revenue or 0)
+            }
+            for product_id, quantity, revenue in lines
+        ])
+
+def add_payment(order_id, amount):
+    """Add ``amount`` (negative for a deleted payment) to the order's paid total in the rollups"""
+    order = (
+        db.session.query(func.date(SalesOrder.order_date), SalesOrder.customer_id, SalesOrder.status)
+        .filter(SalesOrder.id == order_id)
+        .first()
+    )
+    if order is None:
+        return
+    _increment(DailyStatusRollup, STATUS_KEYS, [{
+        'day': _as_date(order[0]),
+        'customer_id': order[1],
+        'status': order[2],
+        'order_count': 0,
+        'total_amount': 0,
+        'paid_amount': amount
+    }])
+
+def rebuild():
+    """Recompute both rollups from scratch"""
+    db.session.query(DailySalesRollup).delete(synchronize_session=False)
+    db.session.query(DailyStatusRollup).delete(synchronize_session=False)
+    _increment(DailySalesRollup, SALES_KEYS, sales_rows())
+    _increment(DailyStatusRollup, STATUS_KEYS, status_rows())
+
+def _differences(model, keys, measures, expected_rows):
+    columns = [getattr(model, name) for name in keys + measures]
+    stored = {tuple(row[:len(keys)]): row[len(keys):] for row in db.session.query(*columns)}
+    expected = {tuple(row[k] for k in keys): [row[m] for m in measures] for row in expected_rows}
+
+    differences = []
+    for key in sorted(set(stored) | set(expected), key=str):
+        have = [round(float(v or 0), 2) for v in stored.get(key, [0] * len(measures))]
+        want = [round(float(v or 0), 2) for v in expected.get(key, [0] * len(measures))]
+        if have != want:
+            differences.append((
+                model.__tablename__,
+                dict(zip(keys, key)),
+                dict(zip(measures, have)),
+                dict(zip(measures, want))
+            ))
+    return differences
+
+def check():
+    """Compare both rollups with a fresh aggregation; returns a list of differences"""
+    return (
+        _differences(DailySalesRollup, SALES_KEYS, SALES_MEASURES, sales_rows())
+        + _differences(DailyStatusRollup, STATUS_KEYS, STATUS_MEASURES, status_rows())
+    )
@@ -0,0 +1,93 @@
+import re
+from sqlalchemy import column, or_, table, text
+from src.models.database import Customer, Product
+
+# Columns searched for each model. On SQLite they are mirrored into an FTS5
+# table named "<table>_fts" that is kept in sync by triggers; on other
+# databases (or if FTS5 is unavailable) search falls back to LIKE.
+SEARCH_COLUMNS = {
+    Customer: ('company_name', 'contact_person', 'email'),
+    Product: ('sku', 'product_name', 'description'),
+}
+
+# Engine URLs whose search index has been installed by this process
+_indexed_engines = set()
+
+def _fts_name(model):
+    return f'{model.__tablename__}_fts'
+
+def _index_ddl(model):
+    """DDL for the FTS5 table and the triggers that keep it in sync"""
+    source = model.__tablename__
+    fts = _fts_name(model)
+    cols = SEARCH_COLUMNS[model]
+    col_list = ', '.join(cols)
+    new_values = ', '.join(f'new.{c}' for c in cols)
+    old_values = ', '.join(f'old.{c}' for c in cols)
+    delete_old = (
+        f"INSERT INTO {fts}({fts}, rowid, {col_list}) "
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    insert_new = f"INSERT INTO {fts}(rowid, {col_list}) VALUES (new.id, {new_values});"
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{col_list}, content='{source}', content_rowid='id', tokenize='unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN {delete_old} END",
+        # Only re-index when a searched column changes, not on every
+        # inventory or timestamp update
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {col_list} ON {source} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+def install_search_index(engine):
+    """Create the FTS5 search tables and triggers if missing, and backfill them"""
+    if engine.dialect.name != 'sqlite':
+        return False
+
+    with engine.begin() as conn:
+        for model in SEARCH_COLUMNS:
+            fts = _fts_name(model)
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': fts}
+            ).first()
+            for statement in _index_ddl(model):
+                conn.execute(text(statement))
+            if not exists:
+                conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+    _indexed_engines.add(str(engine.url))
+    return True
+
+def match_expression(term):
+    """Turn free text from a search box into an FTS5 prefix query.
+
+    Every word must match, and the last word may be incomplete, so
+    "acme wid" finds "Acme Widgets". Words are quoted, which keeps FTS5
+    operators typed by users from being interpreted.
+    """
+    words = re.findall(r'\w+', term)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+def apply_search(query, model, term):
+    """Filter ``query`` down to rows of ``model`` matching ``term``.
+
+    Returns the filtered query and whether it is ordered by relevance.
+    """
+    engine = query.session.get_bind()
+    expression = match_expression(term)
+    if expression is None or str(engine.url) not in _indexed_engines:
+        return query.filter(or_(*[getattr(model, c).contains(term) for c in SEARCH_COLUMNS[model]])), False
+
+    fts_name = _fts_name(model)
+    fts = table(fts_name, column('rowid'), column('rank'))
+    query = (
+        query.join(fts, fts.c.rowid == model.id)
+        .filter(text(f'{fts_name} MATCH :search_expression').bindparams(search_expression=expression))
+        .order_by(fts.c.rank, model.id)
+    )
+    return query, True
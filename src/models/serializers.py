@@ -0,0 +1,171 @@
+from collections import defaultdict
+from sqlalchemy import Float, Numeric, type_coerce
+from src.models.database import db, Customer, OrderLineItem, Payment, Product, SalesOrder
+
+# Maximum number of values bound into one IN (...) clause
+IN_CHUNK_SIZE = 500
+
+class Schema:
+    """Serializes column tuples of one model into the same dicts as its to_dict().
+
+    Working from plain rows instead of ORM instances skips identity-map
+    bookkeeping and attribute instrumentation. Numeric columns are read
+    as floats rather than going through Decimal, and rounded to the
+    column's scale as the Decimal result processor would. Dates are left
+    for the app's JSON provider to encode.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = tuple(fields)
+        # Numeric column name -> scale
+        self.numeric = {
+            name: getattr(model, name).type.scale
+            for name in self.fields
+            if isinstance(getattr(model, name).type, Numeric)
+        }
+
+    def column(self, name):
+        column = getattr(self.model, name)
+        if name in self.numeric:
+            return type_coerce(column, Float).label(name)
+        return column
+
+    def columns(self, names=None):
+        return [self.column(name) for name in (names or self.fields)]
+
+    def select_in(self, column, values, names=None):
+        """Rows whose ``column`` is in ``values``, ordered by id within each value.
+
+        Values are sent in chunks to stay under the database's bound
+        parameter limit.
+        """
+        values = sorted(values)
+        rows = []
+        for start in range(0, len(values), IN_CHUNK_SIZE):
+            rows.extend(
+                db.session.query(*self.columns(names))
+                .filter(column.in_(values[start:start + IN_CHUNK_SIZE]))
+                .order_by(column, self.model.id)
+                .all()
+            )
+        return rows
+
+    def serialize(self, row, names=None):
+        result = {}
+        for name, value in zip(names or self.fields, row):
+            if value is not None and name in self.numeric:
+                value = round(float(value), self.numeric[name])
+            result[name] = value
+        return result
+
+CUSTOMER = Schema(Customer, [
+    'id', 'company_name', 'contact_person', 'email', 'phone', 'billing_address',
+    'created_at', 'updated_at'
+])
+PRODUCT = Schema(Product, [
+    'id', 'sku', 'product_name', 'description', 'unit_price', 'inventory_quantity',
+    'created_at', 'updated_at'
+])
+LINE_ITEM = Schema(OrderLineItem, [
+    'id', 'order_id', 'product_id', 'quantity', 'unit_price', 'line_total',
+    'fulfillment_status', 'fulfilled_quantity'
+])
+PAYMENT = Schema(Payment, [
+    'id', 'order_id', 'payment_amount', 'payment_date', 'payment_method',
+    'reference_number', 'created_at'
+])
+ORDER = Schema(SalesOrder, [
+    'id', 'order_number', 'customer_id', 'order_date', 'status', 'total_amount',
+    'payment_status', 'paid_amount', 'delivery_address', 'created_at', 'updated_at'
+])
+
+# Related collections an order can include, on top of its own columns
+ORDER_RELATIONS = ('customer', 'line_items', 'payments')
+ORDER_FIELDS = ORDER.fields + ORDER_RELATIONS
+
+# Columns always fetched for an order page: the keyset pagination key
+ORDER_KEY_FIELDS = ('created_at', 'id')
+
+def parse_fields(raw, allowed):
+    """Parse a ``fields=a,b,c`` parameter into a tuple of names, or None for all"""
+    if not raw:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return names
+
+def order_row_fields(fields):
+    """Order columns to select for the requested output ``fields``"""
+    wanted = fields or ORDER_FIELDS
+    names = [name for name in ORDER.fields if name in wanted or name in ORDER_KEY_FIELDS]
+    if 'customer' in wanted and 'customer_id' not in names:
+        names.append('customer_id')
+    return names
+
+def order_columns(fields=None):
+    return ORDER.columns(order_row_fields(fields))
+
+def serialize_orders(rows, fields=None, embed=True):
+    """Serialize order rows selected with order_columns(fields).
+
+    Related customers, line items, products and payments are each fetched
+    with one IN query for the whole page. With ``embed`` false, related
+    entities are referenced instead of embedded: ``customer`` becomes
+    ``customer_id``, and ``line_items`` and ``payments`` become
+    ``line_item_ids`` and ``payment_ids``.
+    """
+    wanted = fields or ORDER_FIELDS
+    names = order_row_fields(fields)
+    order_fields = [name for name in names if name in wanted]
+    order_ids = [row.id for row in rows]
+
+    customers = {}
+    if 'customer' in wanted and embed:
+        customer_ids = {row.customer_id for row in rows}
+        customers = {
+            row.id: CUSTOMER.serialize(row)
+            for row in CUSTOMER.select_in(Customer.id, customer_ids)
+        }
+
+    line_items = defaultdict(list)
+    if 'line_items' in wanted and embed:
+        items = [LINE_ITEM.serialize(row) for row in LINE_ITEM.select_in(OrderLineItem.order_id, order_ids)]
+        product_ids = {item['product_id'] for item in items}
+        products = {
+            row.id: PRODUCT.serialize(row)
+            for row in PRODUCT.select_in(Product.id, product_ids)
+        }
+        for item in items:
+            item['product'] = products.get(item['product_id'])
+            line_items[item['order_id']].append(item)
+    elif 'line_items' in wanted:
+        for row in LINE_ITEM.select_in(OrderLineItem.order_id, order_ids, ('id', 'order_id')):
+            line_items[row.order_id].append(row.id)
+
+    payments = defaultdict(list)
+    if 'payments' in wanted:
+        if embed:
+            for row in PAYMENT.select_in(Payment.order_id, order_ids):
+                payments[row.order_id].append(PAYMENT.serialize(row))
+        else:
+            for row in PAYMENT.select_in(Payment.order_id, order_ids, ('id', 'order_id')):
+                payments[row.order_id].append(row.id)
+
+    result = []
+    for row in rows:
+        values = dict(zip(names, row))
+        order = ORDER.serialize([values[name] for name in order_fields], order_fields)
+        if 'customer' in wanted:
+            if embed:
+                order['customer'] = customers.get(values['customer_id'])
+            else:
+                order['customer_id'] = values['customer_id']
+        if 'line_items' in wanted:
+            order['line_items' if embed else 'line_item_ids'] = line_items[row.id]
+        if 'payments' in wanted:
+            order['payments' if embed else 'payment_ids'] = payments[row.id]
+        result.append(order)
+    return result
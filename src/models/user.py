@@ -1,23 +1,56 @@
-from flask_sqlalchemy import SQLAlchemy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
 from flask_bcrypt import Bcrypt
+from src.models.database import db
+from src.utils.passwords import PasswordPoolBusy, hash_cost, password_hasher
 
-db = SQLAlchemy()
 bcrypt = Bcrypt()
 
+# Upgrades of stored hashes to the current cost, run after the login response
+_rehash_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rehash')
+_rehash_pending = set()
+_rehash_lock = threading.Lock()
+
+def _rehash(app, user_id, old_hash, password, rounds):
+    try:
+        new_hash = password_hasher.hash(password, rounds)
+    except PasswordPoolBusy:
+        return  # tried again on the next login
+    finally:
+        with _rehash_lock:
+            _rehash_pending.discard(user_id)
+    with app.app_context():
+        # Only replace the hash the password was checked against, never a newer one
+        User.query.filter_by(id=user_id, password_hash=old_hash).update({'password_hash': new_hash})
+        db.session.commit()
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
 
+    # Hashing runs in password_hasher's process pool and raises
+    # PasswordPoolBusy when too many calls are already queued
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf8')
+        rounds = current_app.config['BCRYPT_LOG_ROUNDS']
+        self.password_hash = password_hasher.hash(password, rounds)
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
 
-    def __repr__(self):
-        return f'<User {self.username}>'
+    def needs_rehash(self, rounds):
+        return hash_cost(self.password_hash) != rounds
+
+    def rehash_in_background(self, password, rounds):
+        """Re-hash at ``rounds`` once the password has been verified"""
+        with _rehash_lock:
+            if self.id in _rehash_pending:
+                return
+            _rehash_pending.add(self.id)
+        app = current_app._get_current_object()
+        _rehash_executor.submit(_rehash, app, self.id, self.password_hash, password, rounds)
 
     def to_dict(self):
         return {
@@ -25,3 +58,6 @@ class User(db.Model):
             'username': self.username,
             'email': self.email
         }
+
+    def __repr__(self):
+        return f'<User {self.username}>'
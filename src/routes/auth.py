@@ -1,10 +1,21 @@
-from flask import Blueprint, request, jsonify
+import hmac
+import os
+import click
+from flask import Blueprint, current_app, request, jsonify
 from src.models.user import User
-from src.models.database import db
+from src.models.database import db, duplicate_column
+from src.utils.passwords import PasswordPoolBusy, benchmark_cost, password_hasher
 from flask_jwt_extended import create_access_token
+from sqlalchemy.exc import IntegrityError
 
 auth_bp = Blueprint('auth', __name__)
 
+@auth_bp.errorhandler(PasswordPoolBusy)
+def password_pool_busy(e):
+    response = jsonify({'message': str(e)})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
@@ -15,16 +26,18 @@ def register():
     if not username or not email or not password:
         return jsonify({'message': 'Missing username, email, or password'}), 400
 
-    if User.query.filter_by(username=username).first() is not None:
-        return jsonify({'message': 'Username already exists'}), 409
-
-    if User.query.filter_by(email=email).first() is not None:
-        return jsonify({'message': 'Email already exists'}), 409
-
     new_user = User(username=username, email=email)
     new_user.set_password(password)
-    db.session.add(new_user)
-    db.session.commit()
+    # The unique constraints on username and email reject duplicates
+    try:
+        db.session.add(new_user)
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        column = duplicate_column(e, 'username', 'email')
+        if column is None:
+            raise
+        return jsonify({'message': f'{column.capitalize()} already exists'}), 409
 
     return jsonify({'message': 'User created successfully'}), 201
 
@@ -37,7 +50,43 @@ def login():
     user = User.query.filter_by(username=username).first()
 
     if user and user.check_password(password):
+        rounds = current_app.config['BCRYPT_LOG_ROUNDS']
+        if user.needs_rehash(rounds):
+            user.rehash_in_background(password, rounds)
         access_token = create_access_token(identity=user.id)
         return jsonify(access_token=access_token)
 
     return jsonify({'message': 'Invalid credentials'}), 401
+
+@auth_bp.route('/auth/metrics', methods=['GET'])
+def password_metrics():
+    """Queue depth, rejections and latency of the password hashing pool"""
+    # Only served when AUTH_METRICS_TOKEN is configured, to callers sending it
+    token = current_app.config.get('AUTH_METRICS_TOKEN')
+    if not token:
+        return jsonify({'message': 'Not found'}), 404
+    if not hmac.compare_digest(request.headers.get('X-Metrics-Token', '').encode(), token.encode()):
+        return jsonify({'message': 'Invalid metrics token'}), 403
+    return jsonify(password_hasher.metrics())
+
+@auth_bp.cli.command('benchmark-hash')
+@click.option('--min-cost', default=10, help='lowest bcrypt cost to time')
+@click.option('--max-cost', default=14, help='highest bcrypt cost to time')
+@click.option('--target-ms', default=250.0, help='acceptable time for one hash')
+@click.option('--seconds', default=1.0, help='time spent measuring each cost')
+def benchmark_hash(min_cost, max_cost, target_ms, seconds):
+    """Time bcrypt at each cost and suggest BCRYPT_LOG_ROUNDS for --target-ms"""
+    cores = os.cpu_count() or 1
+    current = current_app.config['BCRYPT_LOG_ROUNDS']
+    click.echo(f'{cores} core(s), BCRYPT_LOG_ROUNDS={current}')
+    click.echo(f"{'cost':>4} {'ms/hash':>9} {'hashes/s/core':>14} {'hashes/s':>9}")
+    suggested = None
+    for rounds in range(min_cost, max_cost + 1):
+        elapsed = benchmark_cost(rounds, seconds)
+        click.echo(f'{rounds:>4} {elapsed * 1000:>9.1f} {1 / elapsed:>14.1f} {cores / elapsed:>9.1f}')
+        if elapsed * 1000 <= target_ms:
+            suggested = rounds
+    if suggested is None:
+        click.echo(f'No cost in {min_cost}-{max_cost} hashes within {target_ms:g} ms')
+    else:
+        click.echo(f'Highest cost within {target_ms:g} ms: BCRYPT_LOG_ROUNDS={suggested}')
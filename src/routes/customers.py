@@ -1,20 +1,31 @@
 from flask import Blueprint, request, jsonify
 from src.models.database import db, Customer
+from src.models.search import apply_search
+from src.utils.pagination import InvalidPageRequest, keyset_page, parse_limit, wants_page
 
 customers_bp = Blueprint('customers', __name__)
 
 @customers_bp.route('/customers', methods=['GET'])
 def get_customers():
-    """Get all customers with optional search"""
+    """Get all customers with optional search and keyset pagination"""
     search = request.args.get('search', '')
     
     query = Customer.query
+    ranked = False
     if search:
-        query = query.filter(
-            Customer.company_name.contains(search) |
-            Customer.contact_person.contains(search) |
-            Customer.email.contains(search)
-        )
+        query, ranked = apply_search(query, Customer, search)
+    
+    if wants_page(request.args):
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            if ranked:
+                # Relevance-ranked search results are capped at limit, not paged
+                customers, next_cursor = query.limit(limit).all(), None
+            else:
+                customers, next_cursor = keyset_page(query, [Customer.id], limit, after=request.args.get('after'))
+        except InvalidPageRequest as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'items': [customer.to_dict() for customer in customers], 'next_cursor': next_cursor})
     
     customers = query.all()
     return jsonify([customer.to_dict() for customer in customers])
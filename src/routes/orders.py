@@ -1,30 +1,112 @@
-from flask import Blueprint, request, jsonify
+import click
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
+from src.models import rollups
 from src.models.database import db, SalesOrder, OrderLineItem, Product, Customer
+from src.models.serializers import ORDER_FIELDS, order_columns, parse_fields, serialize_orders
+from src.models.inventory import (
+    InsufficientInventory, order_demand, release_inventory, reserve_inventory, transition_status
+)
+from src.utils.idempotency import idempotent, purge_expired
+from src.utils.pagination import InvalidPageRequest, keyset_page, parse_limit, wants_page
+from src.utils.response_cache import invalidate_products
 from datetime import datetime
+import json
+import math
 import uuid
 
 orders_bp = Blueprint('orders', __name__)
 
+# Rows fetched per round trip when streaming an export
+EXPORT_BATCH_SIZE = 500
+
 def generate_order_number():
     """Generate a unique order number"""
     return f"SO-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
 
-@orders_bp.route('/orders', methods=['GET'])
-def get_orders():
-    """Get all orders with optional filtering"""
-    status = request.args.get('status')
-    customer_id = request.args.get('customer_id')
+def order_graph_options():
+    """Loader options that fetch an order's customer, line items, products and
+    payments in a fixed number of queries, however many orders are loaded"""
+    return (
+        selectinload(SalesOrder.customer),
+        selectinload(SalesOrder.line_items).selectinload(OrderLineItem.product),
+        selectinload(SalesOrder.payments),
+    )
+
+def filtered_orders_query(args):
+    """Build the order query for the status/customer_id filters in ``args``"""
+    status = args.get('status')
+    customer_id = args.get('customer_id')
     
     query = SalesOrder.query
     if status:
         query = query.filter(SalesOrder.status == status)
     if customer_id:
         query = query.filter(SalesOrder.customer_id == customer_id)
+    return query
+
+@orders_bp.route('/orders', methods=['GET'])
+def get_orders():
+    """Get all orders with optional filtering, field selection and keyset pagination"""
+    try:
+        fields = parse_fields(request.args.get('fields'), ORDER_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    embed = request.args.get('embed', '1').lower() not in ('0', 'false', 'no')
+    
+    # Select plain column tuples; serialize_orders fetches related rows per page
+    query = filtered_orders_query(request.args).with_entities(*order_columns(fields))
+    
+    if wants_page(request.args):
+        try:
+            orders, next_cursor = keyset_page(
+                query,
+                [SalesOrder.created_at, SalesOrder.id],
+                parse_limit(request.args.get('limit')),
+                after=request.args.get('after'),
+                descending=True
+            )
+        except InvalidPageRequest as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'items': serialize_orders(orders, fields, embed), 'next_cursor': next_cursor})
     
     orders = query.order_by(SalesOrder.created_at.desc()).all()
-    return jsonify([order.to_dict() for order in orders])
+    return jsonify(serialize_orders(orders, fields, embed))
+
+@orders_bp.route('/orders/export', methods=['GET'])
+def export_orders():
+    """Stream every matching order as a JSON array, or as NDJSON with ?format=ndjson"""
+    ndjson = request.args.get('format') == 'ndjson'
+    query = (
+        filtered_orders_query(request.args)
+        .options(*order_graph_options())
+        .order_by(SalesOrder.created_at.desc(), SalesOrder.id.desc())
+        .yield_per(EXPORT_BATCH_SIZE)
+    )
+    
+    def generate():
+        # Orders are fetched EXPORT_BATCH_SIZE at a time from a server-side
+        # cursor and encoded one by one, so memory use does not depend on
+        # how many orders are exported.
+        encode = current_app.json.dumps
+        if ndjson:
+            for order in query:
+                yield encode(order.to_dict()) + '\n'
+            return
+        
+        separator = ''
+        yield '['
+        for order in query:
+            yield separator + encode(order.to_dict())
+            separator = ','
+        yield ']'
+    
+    mimetype = 'application/x-ndjson' if ndjson else 'application/json'
+    return Response(stream_with_context(generate()), mimetype=mimetype)
 
 @orders_bp.route('/orders', methods=['POST'])
+@idempotent
 def create_order():
     """Create a new sales order"""
     data = request.get_json()
@@ -73,6 +155,7 @@ def create_order():
             total_amount += line_total
         
         order.total_amount = total_amount
+        rollups.add_orders([order.id])
         db.session.commit()
         
         return jsonify(order.to_dict()), 201
@@ -80,10 +163,183 @@ def create_order():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def parse_bulk_body():
+    """Read a bulk import body: a JSON array, {"orders": [...]}, or NDJSON.
+    
+    An NDJSON line that is not valid JSON is kept as its decode error, so
+    that it is reported against its own index.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        records = []
+        for line in request.get_data(as_text=True).splitlines():
+            if line.strip():
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    records.append(e)
+        return records
+    
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('orders')
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON array of orders or an NDJSON body')
+    return data
+
+def _as_int(value):
+    """``value`` as an int if it is an integer or an integer string, else None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().lstrip('-').isdigit():
+        return int(value)
+    return None
+
+def _as_number(value):
+    """``value`` as a finite float if it is a number or a numeric string, else None"""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+def normalize_bulk_record(record):
+    """Return ``(record, None)`` with ids and amounts coerced to numbers, or ``(None, error)``"""
+    if isinstance(record, json.JSONDecodeError):
+        return None, f'Invalid JSON: {record}'
+    if not isinstance(record, dict) or not record.get('customer_id') or not record.get('line_items'):
+        return None, 'Customer ID and line items are required'
+    customer_id = _as_int(record['customer_id'])
+    if customer_id is None:
+        return None, 'Customer ID must be an integer'
+    if not isinstance(record['line_items'], list):
+        return None, 'Line items must be a list'
+    
+    line_items = []
+    for item in record['line_items']:
+        if not isinstance(item, dict) or 'product_id' not in item or 'quantity' not in item:
+            return None, 'Each line item needs a product_id and quantity'
+        product_id = _as_int(item['product_id'])
+        if product_id is None:
+            return None, 'Product ID must be an integer'
+        quantity = _as_int(item['quantity'])
+        if quantity is None or quantity <= 0:
+            return None, f'Quantity for product {product_id} must be a positive integer'
+        unit_price = None
+        if item.get('unit_price') is not None:
+            unit_price = _as_number(item['unit_price'])
+            if unit_price is None or unit_price < 0:
+                return None, f'Unit price for product {product_id} must be a non-negative number'
+        line_items.append({'product_id': product_id, 'quantity': quantity, 'unit_price': unit_price})
+    
+    return dict(record, customer_id=customer_id, line_items=line_items), None
+
+def validate_bulk_record(record, customer_ids, products):
+    """Return an error message if a normalized record references missing rows, or None"""
+    if record['customer_id'] not in customer_ids:
+        return 'Customer not found'
+    for item in record['line_items']:
+        if item['product_id'] not in products:
+            return f'Product {item["product_id"]} not found'
+    return None
+
+@orders_bp.route('/orders/bulk', methods=['POST'])
+def bulk_create_orders():
+    """Create many orders at once, reporting the outcome of each record"""
+    try:
+        records = parse_bulk_body()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    results = [None] * len(records)
+    normalized = {}
+    for index, record in enumerate(records):
+        record, error = normalize_bulk_record(record)
+        if error:
+            results[index] = {'index': index, 'status': 'error', 'error': error}
+        else:
+            normalized[index] = record
+    
+    # Resolve every referenced customer and product with one query each
+    customer_refs = {record['customer_id'] for record in normalized.values()}
+    product_refs = {item['product_id'] for record in normalized.values() for item in record['line_items']}
+    customer_ids = {
+        row.id for row in db.session.query(Customer.id).filter(Customer.id.in_(customer_refs))
+    }
+    products = {
+        row.id: row.unit_price
+        for row in db.session.query(Product.id, Product.unit_price).filter(Product.id.in_(product_refs))
+    }
+    
+    accepted = []
+    order_rows = []
+    for index, record in normalized.items():
+        error = validate_bulk_record(record, customer_ids, products)
+        if error:
+            results[index] = {'index': index, 'status': 'error', 'error': error}
+            continue
+        
+        # Fill in catalog prices so the line rows below reuse them
+        for item in record['line_items']:
+            if item['unit_price'] is None:
+                item['unit_price'] = products[item['product_id']]
+        total_amount = sum(item['quantity'] * float(item['unit_price']) for item in record['line_items'])
+        
+        accepted.append(index)
+        order_rows.append({
+            'order_number': generate_order_number(),
+            'customer_id': record['customer_id'],
+            'delivery_address': record.get('delivery_address'),
+            'status': 'unissued',
+            'total_amount': total_amount
+        })
+    
+    try:
+        if order_rows:
+            order_ids = db.session.scalars(
+                insert(SalesOrder).returning(SalesOrder.id, sort_by_parameter_order=True),
+                order_rows
+            ).all()
+            
+            line_rows = []
+            for index, order_id in zip(accepted, order_ids):
+                for item in normalized[index]['line_items']:
+                    line_rows.append({
+                        'order_id': order_id,
+                        'product_id': item['product_id'],
+                        'quantity': item['quantity'],
+                        'unit_price': item['unit_price'],
+                        'line_total': item['quantity'] * float(item['unit_price'])
+                    })
+            db.session.execute(insert(OrderLineItem), line_rows)
+            rollups.add_orders(order_ids)
+            
+            for index, order_id, row in zip(accepted, order_ids, order_rows):
+                results[index] = {
+                    'index': index,
+                    'status': 'created',
+                    'id': order_id,
+                    'order_number': row['order_number']
+                }
+        
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({
+        'created': len(order_rows),
+        'failed': len(records) - len(order_rows),
+        'results': results
+    })
+
 @orders_bp.route('/orders/<int:order_id>', methods=['GET'])
 def get_order(order_id):
     """Get a specific order"""
-    order = SalesOrder.query.get_or_404(order_id)
+    order = SalesOrder.query.options(*order_graph_options()).get_or_404(order_id)
     return jsonify(order.to_dict())
 
 @orders_bp.route('/orders/<int:order_id>', methods=['PUT'])
@@ -116,23 +372,22 @@ def issue_order(order_id):
         return jsonify({'error': 'Order is already issued or completed'}), 400
     
     try:
-        # Check inventory availability and allocate
-        for line_item in order.line_items:
-            product = line_item.product
-            if product.inventory_quantity < line_item.quantity:
-                return jsonify({
-                    'error': f'Insufficient inventory for {product.product_name}. Available: {product.inventory_quantity}, Required: {line_item.quantity}'
-                }), 400
-        
-        # Allocate inventory
-        for line_item in order.line_items:
-            product = line_item.product
-            product.inventory_quantity -= line_item.quantity
+        # Claim the transition first so concurrent issue calls cannot both
+        # reserve stock, then allocate with conditional per-product updates
+        if not transition_status(order.id, 'unissued', 'issued'):
+            db.session.rollback()
+            return jsonify({'error': 'Order is already issued or completed'}), 400
         
-        order.status = 'issued'
+        demand = order_demand(order.id)
+        reserve_inventory(demand)
+        rollups.move_status(order.id, 'unissued')
         db.session.commit()
+        invalidate_products(*demand)
         
         return jsonify(order.to_dict())
+    except InsufficientInventory as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'shortfalls': e.shortfalls}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -147,13 +402,19 @@ def void_order(order_id):
     
     try:
         # Return allocated inventory if order was issued
-        if order.status == 'issued':
-            for line_item in order.line_items:
-                product = line_item.product
-                product.inventory_quantity += line_item.quantity
+        demand = {}
+        if transition_status(order.id, 'issued', 'voided'):
+            demand = order_demand(order.id)
+            release_inventory(demand)
+            rollups.move_status(order.id, 'issued')
+        elif transition_status(order.id, 'unissued', 'voided'):
+            rollups.move_status(order.id, 'unissued')
+        else:
+            db.session.rollback()
+            return jsonify({'error': 'Cannot void completed orders'}), 400
         
-        order.status = 'voided'
         db.session.commit()
+        invalidate_products(*demand)
         
         return jsonify(order.to_dict())
     except Exception as e:
@@ -169,13 +430,19 @@ def complete_order(order_id):
         return jsonify({'error': 'Order must be issued before completion'}), 400
     
     try:
+        # Claim the transition first so a concurrent void cannot release
+        # inventory of an order that is then marked complete
+        if not transition_status(order.id, 'issued', 'complete'):
+            db.session.rollback()
+            return jsonify({'error': 'Order is no longer issued'}), 409
+        
         # Mark all unfulfilled items as fulfilled
         for line_item in order.line_items:
             if line_item.fulfillment_status == 'unfulfilled':
                 line_item.fulfillment_status = 'fulfilled'
                 line_item.fulfilled_quantity = line_item.quantity
         
-        order.status = 'complete'
+        rollups.move_status(order.id, 'issued')
         db.session.commit()
         
         return jsonify(order.to_dict())
@@ -209,7 +476,10 @@ def fulfill_line_item(order_id, line_item_id):
         # Check if all line items are fulfilled
         all_fulfilled = all(item.fulfillment_status == 'fulfilled' for item in order.line_items)
         if all_fulfilled:
-            order.status = 'complete'
+            if not transition_status(order.id, 'issued', 'complete'):
+                db.session.rollback()
+                return jsonify({'error': 'Order is no longer issued'}), 409
+            rollups.move_status(order.id, 'issued')
         
         db.session.commit()
         return jsonify(order.to_dict())
@@ -217,3 +487,8 @@ def fulfill_line_item(order_id, line_item_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+
+@orders_bp.cli.command('purge-idempotency-keys')
+def purge_idempotency_keys():
+    """Delete Idempotency-Key responses past their expiry"""
+    click.echo(f'Removed {purge_expired()} expired idempotency key(s)')
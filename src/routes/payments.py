@@ -1,9 +1,41 @@
+import click
 from flask import Blueprint, request, jsonify
+from sqlalchemy import case, func, update
+from src.models import rollups
 from src.models.database import db, Payment, SalesOrder
+from src.utils.idempotency import idempotent
 from decimal import Decimal
 
 payments_bp = Blueprint('payments', __name__)
 
+def order_total():
+    """Order total rounded to cents, as SQLite may store it as an inexact REAL"""
+    return func.round(SalesOrder.total_amount, 2)
+
+def payment_status_case(paid):
+    """SQL expression for the payment status of an order whose paid total is ``paid``"""
+    return case(
+        (paid >= order_total(), 'paid'),
+        (paid > 0, 'partial'),
+        else_='unpaid'
+    )
+
+def apply_payment_delta(order_id, amount):
+    """Add ``amount`` to an order's paid total and refresh its payment status.
+    
+    Done as one conditional UPDATE, so the cost does not depend on how many
+    payments the order already has and concurrent payments cannot push the
+    total past the order amount. Returns False, changing nothing, if the
+    new paid total would exceed the order total.
+    """
+    new_paid = func.round(SalesOrder.paid_amount + amount, 2)
+    result = db.session.execute(
+        update(SalesOrder)
+        .where(SalesOrder.id == order_id, new_paid <= order_total())
+        .values(paid_amount=new_paid, payment_status=payment_status_case(new_paid))
+    )
+    return result.rowcount == 1
+
 @payments_bp.route('/orders/<int:order_id>/payments', methods=['GET'])
 def get_order_payments(order_id):
     """Get all payments for a specific order"""
@@ -12,9 +44,10 @@ def get_order_payments(order_id):
     return jsonify([payment.to_dict() for payment in payments])
 
 @payments_bp.route('/orders/<int:order_id>/payments', methods=['POST'])
+@idempotent
 def record_payment(order_id):
     """Record a payment for an order"""
-    order = SalesOrder.query.get_or_404(order_id)
+    SalesOrder.query.get_or_404(order_id)
     data = request.get_json()
     
     if not data or not data.get('payment_amount'):
@@ -22,14 +55,6 @@ def record_payment(order_id):
     
     payment_amount = Decimal(str(data['payment_amount']))
     
-    # Calculate total payments so far
-    existing_payments = Payment.query.filter_by(order_id=order_id).all()
-    total_paid = sum(Decimal(str(p.payment_amount)) for p in existing_payments)
-    
-    # Check if payment amount is valid
-    if total_paid + payment_amount > order.total_amount:
-        return jsonify({'error': 'Payment amount exceeds order total'}), 400
-    
     payment = Payment(
         order_id=order_id,
         payment_amount=payment_amount,
@@ -38,17 +63,13 @@ def record_payment(order_id):
     )
     
     try:
-        db.session.add(payment)
-        
-        # Update order payment status
-        new_total_paid = total_paid + payment_amount
-        if new_total_paid >= order.total_amount:
-            order.payment_status = 'paid'
-        elif new_total_paid > 0:
-            order.payment_status = 'partial'
-        else:
-            order.payment_status = 'unpaid'
+        # Update the order's paid total and payment status
+        if not apply_payment_delta(order_id, payment_amount):
+            db.session.rollback()
+            return jsonify({'error': 'Payment amount exceeds order total'}), 400
         
+        rollups.add_payment(order_id, payment_amount)
+        db.session.add(payment)
         db.session.commit()
         return jsonify(payment.to_dict()), 201
     except Exception as e:
@@ -65,25 +86,48 @@ def get_payment(payment_id):
 def delete_payment(payment_id):
     """Delete a payment"""
     payment = Payment.query.get_or_404(payment_id)
-    order = payment.order
     
     try:
+        # Take the payment off the order's paid total and payment status
+        apply_payment_delta(payment.order_id, -payment.payment_amount)
+        rollups.add_payment(payment.order_id, -payment.payment_amount)
         db.session.delete(payment)
-        
-        # Recalculate payment status
-        remaining_payments = Payment.query.filter_by(order_id=order.id).filter(Payment.id != payment_id).all()
-        total_paid = sum(Decimal(str(p.payment_amount)) for p in remaining_payments)
-        
-        if total_paid >= order.total_amount:
-            order.payment_status = 'paid'
-        elif total_paid > 0:
-            order.payment_status = 'partial'
-        else:
-            order.payment_status = 'unpaid'
-        
         db.session.commit()
         return jsonify({'message': 'Payment deleted successfully'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@payments_bp.cli.command('reconcile')
+@click.option('--fix', is_flag=True, help='Rewrite paid_amount and payment_status from the payments table.')
+def reconcile_payments(fix):
+    """Check each order's paid_amount against the sum of its payments"""
+    payment_totals = (
+        db.session.query(Payment.order_id, func.sum(Payment.payment_amount).label('total'))
+        .group_by(Payment.order_id)
+        .subquery()
+    )
+    actual = func.round(func.coalesce(payment_totals.c.total, 0), 2)
+    mismatches = (
+        db.session.query(SalesOrder.id, SalesOrder.paid_amount, actual.label('actual'))
+        .outerjoin(payment_totals, payment_totals.c.order_id == SalesOrder.id)
+        .filter(func.round(SalesOrder.paid_amount, 2) != actual)
+        .all()
+    )
+    
+    for order_id, recorded, expected in mismatches:
+        click.echo(f'Order {order_id}: paid_amount {recorded} != payments total {expected}')
+    
+    if fix and mismatches:
+        for order_id, recorded, expected in mismatches:
+            paid = Decimal(str(expected))
+            db.session.execute(
+                update(SalesOrder)
+                .where(SalesOrder.id == order_id)
+                .values(paid_amount=paid, payment_status=payment_status_case(paid))
+            )
+            rollups.add_payment(order_id, paid - Decimal(str(recorded)))
+        db.session.commit()
+        click.echo(f'Fixed {len(mismatches)} order(s)')
+    elif not mismatches:
+        click.echo('All orders reconcile with their payments')
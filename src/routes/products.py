@@ -1,20 +1,34 @@
 from flask import Blueprint, request, jsonify
-from src.models.database import db, Product
+from sqlalchemy.exc import IntegrityError
+from src.models.database import db, Product, duplicate_column
+from src.models.search import apply_search
+from src.utils.pagination import InvalidPageRequest, keyset_page, parse_limit, wants_page
+from src.utils.response_cache import catalog_cache, invalidate_products
 
 products_bp = Blueprint('products', __name__)
 
 @products_bp.route('/products', methods=['GET'])
+@catalog_cache.cached(lambda: 'products')
 def get_products():
-    """Get all products with optional search"""
+    """Get all products with optional search and keyset pagination"""
     search = request.args.get('search', '')
     
     query = Product.query
+    ranked = False
     if search:
-        query = query.filter(
-            Product.product_name.contains(search) |
-            Product.sku.contains(search) |
-            Product.description.contains(search)
-        )
+        query, ranked = apply_search(query, Product, search)
+    
+    if wants_page(request.args):
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            if ranked:
+                # Relevance-ranked search results are capped at limit, not paged
+                products, next_cursor = query.limit(limit).all(), None
+            else:
+                products, next_cursor = keyset_page(query, [Product.id], limit, after=request.args.get('after'))
+        except InvalidPageRequest as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'items': [product.to_dict() for product in products], 'next_cursor': next_cursor})
     
     products = query.all()
     return jsonify([product.to_dict() for product in products])
@@ -27,11 +41,6 @@ def create_product():
     if not data or not data.get('sku') or not data.get('product_name') or not data.get('unit_price'):
         return jsonify({'error': 'SKU, product name, and unit price are required'}), 400
     
-    # Check if SKU already exists
-    existing_product = Product.query.filter_by(sku=data['sku']).first()
-    if existing_product:
-        return jsonify({'error': 'Product with this SKU already exists'}), 400
-    
     product = Product(
         sku=data['sku'],
         product_name=data['product_name'],
@@ -43,12 +52,20 @@ def create_product():
     try:
         db.session.add(product)
         db.session.commit()
+        invalidate_products(product.id)
         return jsonify(product.to_dict()), 201
+    except IntegrityError as e:
+        db.session.rollback()
+        # The unique constraint on sku rejects duplicates
+        if duplicate_column(e, 'sku'):
+            return jsonify({'error': 'Product with this SKU already exists'}), 400
+        return jsonify({'error': str(e)}), 500
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @products_bp.route('/products/<int:product_id>', methods=['GET'])
+@catalog_cache.cached(lambda product_id: f'product:{product_id}')
 def get_product(product_id):
     """Get a specific product"""
     product = Product.query.get_or_404(product_id)
@@ -63,12 +80,6 @@ def update_product(product_id):
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
-    # Check if SKU is being changed and if it already exists
-    if 'sku' in data and data['sku'] != product.sku:
-        existing_product = Product.query.filter_by(sku=data['sku']).first()
-        if existing_product:
-            return jsonify({'error': 'Product with this SKU already exists'}), 400
-    
     product.sku = data.get('sku', product.sku)
     product.product_name = data.get('product_name', product.product_name)
     product.description = data.get('description', product.description)
@@ -77,7 +88,13 @@ def update_product(product_id):
     
     try:
         db.session.commit()
+        invalidate_products(product_id)
         return jsonify(product.to_dict())
+    except IntegrityError as e:
+        db.session.rollback()
+        if duplicate_column(e, 'sku'):
+            return jsonify({'error': 'Product with this SKU already exists'}), 400
+        return jsonify({'error': str(e)}), 500
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -90,6 +107,7 @@ def delete_product(product_id):
     try:
         db.session.delete(product)
         db.session.commit()
+        invalidate_products(product_id)
         return jsonify({'message': 'Product deleted successfully'})
     except Exception as e:
         db.session.rollback()
@@ -108,6 +126,7 @@ def update_inventory(product_id):
     
     try:
         db.session.commit()
+        invalidate_products(product_id)
         return jsonify(product.to_dict())
     except Exception as e:
         db.session.rollback()
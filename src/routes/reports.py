@@ -0,0 +1,232 @@
+import click
+from flask import Blueprint, request, jsonify
+from sqlalchemy import case, func
+from src.models import rollups
+from src.models.database import db, Customer, DailySalesRollup, DailyStatusRollup, Product, SalesOrder
+from datetime import date, datetime, timedelta
+
+reports_bp = Blueprint('reports', __name__)
+
+PERIODS = ('day', 'week', 'month')
+
+# Receivables ageing buckets: (label, minimum age in days)
+AGEING_BUCKETS = (('90+', 91), ('61-90', 61), ('31-60', 31), ('0-30', 0))
+
+def parse_date_range(args):
+    """Read ``start``/``end`` (inclusive YYYY-MM-DD dates) into date bounds"""
+    bounds = []
+    for name in ('start', 'end'):
+        raw = args.get(name)
+        if not raw:
+            bounds.append(None)
+            continue
+        try:
+            bounds.append(date.fromisoformat(raw))
+        except ValueError:
+            raise ValueError(f'{name} must be a date in YYYY-MM-DD format')
+    return tuple(bounds)
+
+def parse_top_limit(args):
+    try:
+        return max(1, min(int(args.get('limit', 10)), 100))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+
+def in_range(query, model, start=None, end=None):
+    """Restrict a rollup query to days between ``start`` and ``end`` inclusive"""
+    if start is not None:
+        query = query.filter(model.day >= start)
+    if end is not None:
+        query = query.filter(model.day <= end)
+    return query
+
+def period_start(column, period):
+    """SQL expression for the first day of the day/week/month containing ``column``"""
+    if db.engine.dialect.name == 'postgresql':
+        return func.to_char(func.date_trunc(period, column), 'YYYY-MM-DD')
+    if period == 'day':
+        return func.date(column)
+    if period == 'week':
+        # Weeks start on Monday: move to the next Sunday, then back six days
+        return func.date(column, 'weekday 0', '-6 days')
+    return func.date(column, 'start of month')
+
+def report_error(e):
+    return jsonify({'error': str(e)}), 400
+
+@reports_bp.route('/reports/revenue', methods=['GET'])
+def revenue_by_period():
+    """Order count and revenue per day, week or month"""
+    period = request.args.get('period', 'day')
+    if period not in PERIODS:
+        return report_error(f"period must be one of: {', '.join(PERIODS)}")
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError as e:
+        return report_error(e)
+
+    bucket = period_start(DailyStatusRollup.day, period).label('period')
+    rows = (
+        in_range(db.session.query(
+            bucket,
+            func.sum(DailyStatusRollup.order_count),
+            func.sum(DailyStatusRollup.total_amount)
+        ), DailyStatusRollup, start, end)
+        .filter(DailyStatusRollup.status != 'voided')
+        .group_by(bucket)
+        .having(func.sum(DailyStatusRollup.order_count) > 0)
+        .order_by(bucket)
+        .all()
+    )
+    return jsonify([
+        {'period': str(row[0]), 'order_count': int(row[1]), 'revenue': float(row[2] or 0)}
+        for row in rows
+    ])
+
+@reports_bp.route('/reports/revenue-by-status', methods=['GET'])
+def revenue_by_status():
+    """Order count, revenue and amount paid per order status"""
+    try:
+        start, end = parse_date_range(request.args)
+    except ValueError as e:
+        return report_error(e)
+
+    rows = (
+        in_range(db.session.query(
+            DailyStatusRollup.status,
+            func.sum(DailyStatusRollup.order_count),
+            func.sum(DailyStatusRollup.total_amount),
+            func.sum(DailyStatusRollup.paid_amount)
+        ), DailyStatusRollup, start, end)
+        .group_by(DailyStatusRollup.status)
+        .having(func.sum(DailyStatusRollup.order_count) > 0)
+        .order_by(DailyStatusRollup.status)
+        .all()
+    )
+    return jsonify([
+        {
+            'status': row[0],
+            'order_count': int(row[1]),
+            'revenue': float(row[2] or 0),
+            'paid_amount': float(row[3] or 0)
+        }
+        for row in rows
+    ])
+
+@reports_bp.route('/reports/top-customers', methods=['GET'])
+def top_customers():
+    """Customers ranked by revenue"""
+    try:
+        start, end = parse_date_range(request.args)
+        limit = parse_top_limit(request.args)
+    except ValueError as e:
+        return report_error(e)
+
+    revenue = func.sum(DailyStatusRollup.total_amount).label('revenue')
+    totals = (
+        in_range(db.session.query(
+            DailyStatusRollup.customer_id,
+            func.sum(DailyStatusRollup.order_count).label('order_count'),
+            revenue
+        ), DailyStatusRollup, start, end)
+        .filter(DailyStatusRollup.status != 'voided')
+        .group_by(DailyStatusRollup.customer_id)
+        .having(func.sum(DailyStatusRollup.order_count) > 0)
+        .order_by(revenue.desc())
+        .limit(limit)
+        .subquery()
+    )
+    rows = (
+        db.session.query(Customer.id, Customer.company_name, totals.c.order_count, totals.c.revenue)
+        .join(totals, totals.c.customer_id == Customer.id)
+        .order_by(totals.c.revenue.desc(), Customer.id)
+        .all()
+    )
+    return jsonify([
+        {'customer_id': row[0], 'company_name': row[1], 'order_count': int(row[2]), 'revenue': float(row[3] or 0)}
+        for row in rows
+    ])
+
+@reports_bp.route('/reports/top-products', methods=['GET'])
+def top_products():
+    """Products (SKUs) ranked by revenue"""
+    try:
+        start, end = parse_date_range(request.args)
+        limit = parse_top_limit(request.args)
+    except ValueError as e:
+        return report_error(e)
+
+    revenue = func.sum(DailySalesRollup.revenue).label('revenue')
+    totals = (
+        in_range(db.session.query(
+            DailySalesRollup.product_id,
+            func.sum(DailySalesRollup.quantity).label('quantity'),
+            revenue
+        ), DailySalesRollup, start, end)
+        .group_by(DailySalesRollup.product_id)
+        .having(func.sum(DailySalesRollup.quantity) > 0)
+        .order_by(revenue.desc())
+        .limit(limit)
+        .subquery()
+    )
+    rows = (
+        db.session.query(Product.id, Product.sku, Product.product_name, totals.c.quantity, totals.c.revenue)
+        .join(totals, totals.c.product_id == Product.id)
+        .order_by(totals.c.revenue.desc(), Product.id)
+        .all()
+    )
+    return jsonify([
+        {
+            'product_id': row[0],
+            'sku': row[1],
+            'product_name': row[2],
+            'quantity': int(row[3]),
+            'revenue': float(row[4] or 0)
+        }
+        for row in rows
+    ])
+
+@reports_bp.route('/reports/receivables-ageing', methods=['GET'])
+def receivables_ageing():
+    """Outstanding balances of unpaid orders, bucketed by days since the order date"""
+    today = datetime.utcnow()
+    outstanding = SalesOrder.total_amount - SalesOrder.paid_amount
+    bucket = case(
+        *[
+            (SalesOrder.order_date <= today - timedelta(days=min_age), label)
+            for label, min_age in AGEING_BUCKETS[:-1]
+        ],
+        else_=AGEING_BUCKETS[-1][0]
+    ).label('bucket')
+    rows = (
+        db.session.query(bucket, func.count(SalesOrder.id), func.sum(outstanding))
+        .filter(SalesOrder.status != 'voided', SalesOrder.payment_status != 'paid')
+        .group_by(bucket)
+        .all()
+    )
+    totals = {row[0]: (row[1], float(row[2] or 0)) for row in rows}
+    return jsonify([
+        {
+            'bucket': label,
+            'order_count': totals.get(label, (0, 0.0))[0],
+            'outstanding': totals.get(label, (0, 0.0))[1]
+        }
+        for label, _ in reversed(AGEING_BUCKETS)
+    ])
+
+@reports_bp.cli.command('rebuild-rollups')
+def rebuild_rollups():
+    """Recompute the daily sales and status rollups from orders and payments"""
+    rollups.rebuild()
+    db.session.commit()
+    click.echo('Rollups rebuilt')
+
+@reports_bp.cli.command('check-rollups')
+def check_rollups():
+    """Compare the daily rollups with a fresh aggregation of orders"""
+    differences = rollups.check()
+    for table, key, stored, expected in differences:
+        click.echo(f'{table} {key}: stored {stored} != expected {expected}')
+    if differences:
+        raise click.ClickException(f'{len(differences)} rollup row(s) out of date; run rebuild-rollups')
+    click.echo('Rollups are consistent')
@@ -0,0 +1,129 @@
+import hashlib
+import os
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, jsonify, request
+from sqlalchemy.exc import IntegrityError
+from src.models.database import db, IdempotencyKey
+
+# Clients that retry POSTs send an Idempotency-Key header; the first request
+# with a key does the work and later ones with the same key and body get its
+# stored response back. Keys are scoped to the request path and kept for
+# IDEMPOTENCY_TTL_SECONDS (24 hours by default).
+#
+# A claim that never got a response stored (the worker died mid-request) is
+# a lease: after IDEMPOTENCY_LOCK_SECONDS a retry may take it over and run
+# the request again. Keep it above the longest time a request can take.
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 100
+TTL = timedelta(seconds=int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 24 * 3600)))
+LOCK = timedelta(seconds=int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', 60)))
+
+def _request_hash():
+    return hashlib.sha256(request.get_data()).hexdigest()
+
+def _key_query(key):
+    return IdempotencyKey.query.filter_by(idempotency_key=key, path=request.path)
+
+def _take_over(existing, now):
+    """Claim an abandoned in-progress key; False if another request got it first"""
+    taken = _key_query(existing.idempotency_key).filter(
+        IdempotencyKey.status_code.is_(None),
+        IdempotencyKey.created_at == existing.created_at
+    ).update({'created_at': now, 'expires_at': now + TTL})
+    db.session.commit()
+    return taken == 1
+
+def _claim(key, request_hash):
+    """Claim the key for this request.
+
+    Returns ``(claimed_at, None)`` when this request should run the view,
+    or ``(None, row)`` with the row already holding the key.
+    """
+    # Whole seconds, so the claim time compares equal on every backend
+    now = datetime.utcnow().replace(microsecond=0)
+    for _ in range(2):
+        try:
+            db.session.add(IdempotencyKey(
+                idempotency_key=key, path=request.path, request_hash=request_hash,
+                created_at=now, expires_at=now + TTL
+            ))
+            db.session.commit()
+            return now, None
+        except IntegrityError:
+            db.session.rollback()
+        existing = db.session.get(IdempotencyKey, (key, request.path))
+        if existing is None:
+            continue  # released by a failed attempt in the meantime
+        if existing.expires_at <= now:
+            db.session.delete(existing)
+            db.session.commit()
+            continue
+        if (existing.status_code is None and existing.request_hash == request_hash
+                and existing.created_at <= now - LOCK and _take_over(existing, now)):
+            return now, None
+        return None, existing
+    return None, db.session.get(IdempotencyKey, (key, request.path))
+
+def _release(key, claimed_at):
+    db.session.rollback()
+    _key_query(key).filter(IdempotencyKey.created_at == claimed_at).delete()
+    db.session.commit()
+
+def idempotent(view):
+    """Decorator making a POST view safe to retry with an Idempotency-Key.
+
+    The key row is committed before the view runs, so a duplicate that
+    arrives while the first request is still running gets a 409 instead of
+    repeating the work, until the claim is older than LOCK. Responses below
+    500 are stored and replayed; on a server error or exception the key is
+    released so the client can retry.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'}), 400
+
+        request_hash = _request_hash()
+        claimed_at, existing = _claim(key, request_hash)
+        if existing is not None:
+            if existing.request_hash != request_hash:
+                return jsonify({'error': f'{HEADER} was already used with a different request'}), 422
+            if existing.status_code is None:
+                response = jsonify({'error': f'A request with this {HEADER} is still in progress'})
+                response.headers['Retry-After'] = '1'
+                return response, 409
+            response = current_app.response_class(
+                existing.response_body, status=existing.status_code, mimetype='application/json'
+            )
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except Exception:
+            _release(key, claimed_at)
+            raise
+        if response.status_code >= 500:
+            _release(key, claimed_at)
+            return response
+
+        # Discard anything the view left uncommitted (e.g. an early error return)
+        db.session.rollback()
+        # Only store the response while this request still holds the claim
+        _key_query(key).filter(IdempotencyKey.created_at == claimed_at).update({
+            'status_code': response.status_code,
+            'response_body': response.get_data(as_text=True)
+        })
+        db.session.commit()
+        return response
+    return wrapper
+
+def purge_expired():
+    """Delete expired keys; returns how many were removed"""
+    removed = IdempotencyKey.query.filter(IdempotencyKey.expires_at <= datetime.utcnow()).delete()
+    db.session.commit()
+    return removed
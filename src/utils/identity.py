@@ -0,0 +1,40 @@
+import os
+from src.models.database import db
+from src.models.user import User
+from src.utils.cache import LRUCache
+
+# Users behind JWTs, keyed by id, so token-protected requests resolve
+# ``current_user`` without a database round trip. Entries hold plain dicts
+# (never ORM instances, which are bound to the session that loaded them).
+# user_bp invalidates an entry when the user is updated or deleted; changes
+# made by other worker processes show up once the entry expires.
+user_cache = LRUCache(
+    maxsize=int(os.environ.get('USER_CACHE_SIZE', 1024)),
+    ttl=int(os.environ.get('USER_CACHE_TTL', 60))
+)
+
+def load_user(user_id):
+    """``User.to_dict()`` for ``user_id``, or None if there is no such user"""
+    user = user_cache.get(user_id)
+    if user is None:
+        row = db.session.get(User, user_id)
+        if row is None:
+            return None
+        user = row.to_dict()
+        user_cache.set(user_id, user)
+    return user
+
+def invalidate_user(user_id):
+    user_cache.delete(user_id)
+
+def install_user_loader(jwt):
+    """Resolve ``current_user`` for JWT-protected views through the user cache"""
+    @jwt.user_identity_loader
+    def user_identity(identity):
+        # PyJWT requires the ``sub`` claim to be a string
+        return str(identity)
+
+    @jwt.user_lookup_loader
+    def user_lookup(_jwt_header, jwt_data):
+        return load_user(int(jwt_data['sub']))
+    return user_lookup
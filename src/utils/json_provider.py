@@ -0,0 +1,65 @@
+from datetime import date, time
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library encoder is the fallback
+    orjson = None
+
+def encode_default(o):
+    """Encode values the JSON encoders don't handle themselves.
+
+    Decimals become floats and dates and times ISO 8601 strings, the same
+    output models used to produce with float() and isoformat(), so they can
+    hand over raw column values instead.
+    """
+    if isinstance(o, Decimal):
+        return float(o)
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed.
+
+    Output keeps the default provider's format: sorted keys, compact
+    separators (indented in debug mode) and a trailing newline on responses.
+    orjson writes non-ASCII characters as UTF-8 rather than \\u escapes.
+    Calls passing encoder options, and values orjson rejects (such as
+    integers wider than 64 bits), go through the standard library encoder.
+    """
+
+    default = staticmethod(encode_default)
+
+    def _orjson_options(self, indent=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_options()).decode()
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+        except TypeError:
+            return super().response(obj)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
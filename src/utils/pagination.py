@@ -0,0 +1,79 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import literal, tuple_
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+class InvalidPageRequest(ValueError):
+    """Raised when a limit or cursor supplied by the client cannot be used"""
+
+def wants_page(args):
+    """True when the client opted into the paginated response shape"""
+    return 'limit' in args or 'after' in args
+
+def parse_limit(raw):
+    """Parse the ``limit`` query parameter, clamped to MAX_LIMIT"""
+    if raw is None or raw == '':
+        return DEFAULT_LIMIT
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise InvalidPageRequest('limit must be an integer')
+    if limit < 1:
+        raise InvalidPageRequest('limit must be at least 1')
+    return min(limit, MAX_LIMIT)
+
+def encode_cursor(values):
+    """Encode the sort key of the last row on a page as an opaque token"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token, keys):
+    """Decode a token produced by encode_cursor back into typed key values"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidPageRequest('Invalid cursor')
+    if not isinstance(payload, list) or len(payload) != len(keys):
+        raise InvalidPageRequest('Invalid cursor')
+
+    values = []
+    for key, value in zip(keys, payload):
+        try:
+            if key.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif key.type.python_type is int:
+                value = int(value)
+        except (TypeError, ValueError):
+            raise InvalidPageRequest('Invalid cursor')
+        values.append(value)
+    return values
+
+def keyset_page(query, keys, limit, after=None, descending=False):
+    """Return one page of ``query`` ordered by ``keys`` plus the next cursor.
+
+    The page boundary is a row-value comparison on the sort key rather than
+    an OFFSET, so fetching page N costs the same as fetching page 1 as long
+    as ``keys`` is backed by an index.
+    """
+    if after:
+        values = decode_cursor(after, keys)
+        if len(keys) == 1:
+            row_key, boundary = keys[0], literal(values[0], keys[0].type)
+        else:
+            row_key = tuple_(*keys)
+            boundary = tuple_(*[literal(value, key.type) for key, value in zip(keys, values)])
+        query = query.filter(row_key < boundary if descending else row_key > boundary)
+
+    ordering = [key.desc() if descending else key.asc() for key in keys]
+    items = query.order_by(*ordering).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor([getattr(items[-1], key.key) for key in keys])
+    return items, next_cursor
@@ -0,0 +1,184 @@
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+class PasswordPoolBusy(Exception):
+    """The hashing queue is full, or a hash did not finish in time"""
+
+# Run in the pool processes: plain functions of bytes so they pickle cheaply.
+# Each returns its result together with the time spent hashing.
+
+def _hash(password, rounds):
+    start = time.perf_counter()
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+    return hashed, time.perf_counter() - start
+
+def _verify(password, hashed):
+    start = time.perf_counter()
+    matches = bcrypt.checkpw(password, hashed)
+    return matches, time.perf_counter() - start
+
+def hash_cost(password_hash):
+    """Cost factor (log2 rounds) recorded in a bcrypt hash, or None if it isn't one"""
+    parts = password_hash.split('$')
+    if len(parts) != 4 or parts[1] not in ('2a', '2b', '2y') or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+def benchmark_cost(rounds, seconds=1.0):
+    """Seconds one bcrypt hash at ``rounds`` takes on this core"""
+    samples = []
+    deadline = time.perf_counter() + seconds
+    while not samples or time.perf_counter() < deadline:
+        samples.append(_hash(b'benchmark-password', rounds)[1])
+    return min(samples)
+
+class LatencyStats:
+    """Call count and latency percentiles over the most recent ``window`` calls"""
+
+    def __init__(self, window=1000):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def summary(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self.count
+        if not samples:
+            return {'count': count}
+
+        def percentile(p):
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))] * 1000, 2)
+        return {
+            'count': count,
+            'p50_ms': percentile(0.5),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': round(samples[-1] * 1000, 2)
+        }
+
+class PasswordHasher:
+    """Runs bcrypt in a small process pool, off the request threads.
+
+    At most ``max_pending`` calls per process may be queued or running in
+    the pool at once, counting calls whose caller already timed out; further
+    calls raise PasswordPoolBusy straight away instead of
+    tying up a request thread behind a login storm. With ``workers=0``
+    hashing runs inline on the calling thread.
+    """
+
+    def __init__(self, workers=1, max_pending=8, timeout=10.0):
+        self._executor = None
+        self.configure(workers=workers, max_pending=max_pending, timeout=timeout)
+
+    def configure(self, workers=1, max_pending=8, timeout=10.0):
+        self.shutdown()
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._owner = None
+        self.pending = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.latency = {op: {'total': LatencyStats(), 'hashing': LatencyStats()} for op in ('hash', 'verify')}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            # A pool inherited through fork (e.g. gunicorn --preload) belongs to the parent
+            if self._executor is None or self._owner != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._owner = os.getpid()
+            return self._executor
+
+    def _count(self, name, delta=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def _finished(self, slots):
+        """Done callback for a pool job: free its slot once the job has really ended"""
+        slots.release()
+        if slots is self._slots:
+            self._count('pending', -1)
+
+    def _run(self, op, function, *args):
+        start = time.perf_counter()
+        if self.workers == 0:
+            result, hashing = function(*args)
+        else:
+            slots = self._slots
+            if not slots.acquire(blocking=False):
+                self._count('rejected')
+                raise PasswordPoolBusy('Too many password operations in progress, try again shortly')
+            self._count('pending')
+            try:
+                future = self._pool().submit(function, *args)
+            except BaseException:
+                self._finished(slots)
+                raise
+            # A timed-out job keeps running in the pool, so its slot is only
+            # freed when it completes; timeouts cannot pile up extra work
+            future.add_done_callback(lambda _: self._finished(slots))
+            try:
+                result, hashing = future.result(timeout=self.timeout)
+            except FutureTimeout:
+                future.cancel()
+                self._count('timeouts')
+                raise PasswordPoolBusy('Password operation timed out, try again shortly')
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); start a fresh pool on the next call
+                with self._lock:
+                    self._executor = None
+                raise PasswordPoolBusy('Password workers restarting, try again shortly')
+        self.latency[op]['total'].add(time.perf_counter() - start)
+        self.latency[op]['hashing'].add(hashing)
+        return result
+
+    def hash(self, password, rounds=12):
+        """bcrypt hash of ``password`` as a string"""
+        return self._run('hash', _hash, password.encode('utf-8'), rounds).decode('utf-8')
+
+    def verify(self, password_hash, password):
+        """Whether ``password`` matches ``password_hash``"""
+        return self._run('verify', _verify, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def metrics(self):
+        return {
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+            'latency': {
+                op: {kind: stats.summary() for kind, stats in kinds.items()}
+                for op, kinds in self.latency.items()
+            }
+        }
+
+# Shared by every request in this worker process. AUTH_HASH_WORKERS=0 hashes inline.
+password_hasher = PasswordHasher(
+    workers=int(os.environ.get('AUTH_HASH_WORKERS', 1)),
+    max_pending=int(os.environ.get('AUTH_HASH_MAX_PENDING', 8)),
+    timeout=float(os.environ.get('AUTH_HASH_TIMEOUT', 10))
+)
@@ -0,0 +1,98 @@
+import hashlib
+from functools import wraps
+from flask import current_app, request
+from src.models.replicas import read_from_primary
+from src.utils.cache import LRUCache
+
+class ResponseCache:
+    """Cache of encoded JSON responses, invalidated by bumping version tags.
+
+    Every cached response belongs to a tag such as ``products`` or
+    ``product:42``. Write paths bump the tags they affect, which changes the
+    key cached entries are stored under, so stale entries are never served
+    and simply age out of the LRU. Without a shared backend the tag versions
+    are local to the process, so entries also expire after ``ttl`` seconds
+    to bound how long another worker's writes can go unseen.
+    """
+
+    def __init__(self, maxsize=512, ttl=30, backend=None):
+        self.configure(maxsize=maxsize, ttl=ttl, backend=backend)
+
+    def configure(self, maxsize=512, ttl=30, backend=None):
+        self.local = LRUCache(maxsize=maxsize, ttl=None if backend else ttl)
+        self.backend = backend
+        self._versions = {}
+
+    def version(self, tag):
+        if self.backend is not None:
+            return self.backend.get(f'version:{tag}') or 0
+        return self._versions.get(tag, 0)
+
+    def bump(self, *tags):
+        """Invalidate every response cached under ``tags``"""
+        for tag in tags:
+            if self.backend is not None:
+                self.backend.incr(f'version:{tag}')
+            else:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def key(self, tag, key):
+        """Cache key for ``key`` under the current version of ``tag``"""
+        return f'{tag}:{self.version(tag)}:{key}'
+
+    def get(self, cache_key):
+        entry = self.local.get(cache_key)
+        if entry is None and self.backend is not None:
+            entry = self.backend.get(cache_key)
+            if entry is not None:
+                self.local.set(cache_key, entry)
+        return entry
+
+    def set(self, cache_key, body):
+        entry = (body, hashlib.sha1(body).hexdigest())
+        self.local.set(cache_key, entry)
+        if self.backend is not None:
+            self.backend.set(cache_key, entry)
+        return entry
+
+    def cached(self, tag_for):
+        """Decorator caching a view's successful JSON responses.
+
+        ``tag_for`` receives the view arguments and returns the tag the
+        response belongs to; the query string distinguishes entries within
+        a tag. Responses carry an ETag and honour If-None-Match.
+
+        On a miss the view reads from the primary database. A lagging
+        replica could otherwise fill the new version's entry with rows from
+        before the write that bumped it, and serve them until the next bump.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                # Resolve the version before running the view, so a write that
+                # lands while the view runs invalidates what it produces
+                cache_key = self.key(tag_for(**kwargs), request.query_string.decode('latin-1'))
+                entry = self.get(cache_key)
+                if entry is None:
+                    read_from_primary()
+                    response = current_app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    entry = self.set(cache_key, response.get_data())
+
+                body, etag = entry
+                response = current_app.response_class(body, mimetype='application/json')
+                response.set_etag(etag)
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+# Product catalog responses. Tagged "products" for list responses and
+# "product:<id>" for single products.
+catalog_cache = ResponseCache()
+
+def invalidate_products(*product_ids):
+    """Drop cached catalog responses after products were created, changed or deleted"""
+    if not product_ids:
+        return
+    catalog_cache.bump('products', *[f'product:{product_id}' for product_id in product_ids])